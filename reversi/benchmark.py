@@ -0,0 +1,180 @@
+# Benchmark suite for the board primitives, the minimax players, root-parallel search and whole games.
+# The parallel/<size>/<phase>/workers1 and workersN pairs time the same depth-4 search in one process and
+# split over N; their ratio is the speedup.
+#
+#   python -m reversi.benchmark --output bench.json
+#   python -m reversi.benchmark --baseline bench.json --threshold 0.2
+#
+# Every benchmark runs on fixed positions reached by seeded random play, so runs are comparable.
+# Results are written as JSON ({"results": {name: seconds}}); with --baseline, any benchmark more than
+# threshold slower than the saved value is reported and the exit status is 1.
+import argparse
+import json
+import random
+import sys
+import time
+
+from reversi.reversi_board import ReversiBoard
+from reversi.reversi_game import ReversiGame
+from reversi.player6.parallel_search import RootParallelSearch
+from reversi.player6.reversi_players import GreedyPlayer, MiniMaxPlayer, RandomComputerPlayer
+import reversi.player6.all_players as players
+
+SIZES = [4, 6, 8, 10]
+
+# Fraction of the board filled in each benchmark position
+PHASES = {"opening": 0.15, "midgame": 0.5, "endgame": 0.85}
+
+PLAYER_FACTORIES = {
+    "default": players.get_default_player,
+    "a": players.get_player_a,
+    "b": players.get_player_b,
+    "c": players.get_player_c,
+    "d": players.get_player_d,
+    "combined": players.get_combined_player,
+}
+
+
+def benchmark_position(size, phase, seed=0):
+    # Returns (board, symbol to move) after seeded random play fills the phase's share of the board
+    rng = random.Random("%d-%s-%d" % (size, phase, seed))
+    target = int(size * size * PHASES[phase])
+    while True:
+        board = ReversiBoard(size)
+        symbol = "X"
+        while size * size - board.get_empty_count() < target and board.game_continues():
+            moves = board.calc_valid_moves(symbol)
+            if moves:
+                board.make_move(symbol, rng.choice(moves))
+            symbol = board.get_opponent_symbol(symbol)
+        if board.calc_valid_moves(symbol):
+            return board, symbol
+        if board.calc_valid_moves(board.get_opponent_symbol(symbol)):
+            return board, board.get_opponent_symbol(symbol)
+
+
+def time_call(function, number, repeat=3):
+    # Best time per call over repeat runs of number calls
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        for k in range(number):
+            function()
+        elapsed = (time.perf_counter() - start) / number
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def bench_board(results, size, phase, number):
+    board, symbol = benchmark_position(size, phase)
+    move = board.calc_valid_moves(symbol)[0]
+    prefix = "board/%d/%s/" % (size, phase)
+
+    def make_unmake():
+        board.unmake_move(board.make_move(symbol, move))
+
+    results[prefix + "calc_valid_moves"] = time_call(lambda: board.calc_valid_moves(symbol), number)
+    results[prefix + "make_unmake_move"] = time_call(make_unmake, number)
+    results[prefix + "calc_scores"] = time_call(board.calc_scores, number)
+
+
+def bench_players(results, size, phase):
+    board, symbol = benchmark_position(size, phase)
+    for name, factory in PLAYER_FACTORIES.items():
+        # A fresh player per run so transposition tables start empty
+        def get_move():
+            factory(symbol).get_move(board.copy())
+        results["get_move/%s/%d/%s" % (name, size, phase)] = time_call(get_move, 1)
+
+
+def bench_parallel(results, size, phase, workers, depth=4):
+    # Root-parallel search against the same search in one process: wall time of each at the same depth
+    board, symbol = benchmark_position(size, phase)
+    player = MiniMaxPlayer(symbol, False, True, True, False, depth=depth)
+    parallel = RootParallelSearch(player, workers, measure_speedup=True)
+    try:
+        # Starts the worker processes so that their start-up is not timed
+        parallel.search(board, symbol, 1)
+        parallel.search(board, symbol, depth)
+    finally:
+        parallel.close()
+    prefix = "parallel/%d/%s/" % (size, phase)
+    results[prefix + "workers1"] = parallel.last_serial_time
+    results[prefix + "workers%d" % workers] = parallel.last_wall_time
+
+
+def bench_games(results, size, games):
+    # Whole-game time (harness included) for random play and for the default player against greedy
+    def random_games():
+        random.seed(size)
+        for i in range(games):
+            ReversiGame(RandomComputerPlayer("X"), RandomComputerPlayer("O"), show_status=False, board_size=size,
+                        copy_board=False)
+
+    def minimax_games():
+        random.seed(size)
+        for i in range(games):
+            ReversiGame(players.get_default_player("X"), GreedyPlayer("O"), show_status=False, board_size=size,
+                        copy_board=False)
+
+    results["game/random/%d" % size] = time_call(random_games, 1) / games
+    results["game/default_vs_greedy/%d" % size] = time_call(minimax_games, 1, repeat=1) / games
+
+
+def run_benchmarks(sizes=SIZES, number=1000, games=5, search=True, workers=2):
+    results = {}
+    for size in sizes:
+        for phase in PHASES:
+            bench_board(results, size, phase, number)
+            if search:
+                bench_players(results, size, phase)
+                if workers > 1:
+                    bench_parallel(results, size, phase, workers)
+        bench_games(results, size, games)
+    return results
+
+
+def compare_to_baseline(results, baseline, threshold):
+    # Returns [(name, baseline seconds, current seconds)] for benchmarks slower than baseline * (1 + threshold)
+    regressions = []
+    for name, seconds in sorted(results.items()):
+        if name in baseline and seconds > baseline[name] * (1 + threshold):
+            regressions.append((name, baseline[name], seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reversi benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--number", type=int, default=1000, help="calls per board primitive timing")
+    parser.add_argument("--games", type=int, default=5, help="games per whole-game timing")
+    parser.add_argument("--no-search", action="store_true", help="skip the get_move benchmarks")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="processes for the root-parallel search benchmarks (1 skips them)")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%%")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.number, args.games, not args.no_search, args.workers)
+    report = {"python": sys.version.split()[0], "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(report, indent=2, sort_keys=True))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        for name, before, after in regressions:
+            print("REGRESSION %s: %.3g s -> %.3g s (%+.0f%%)" % (name, before, after, (after / before - 1) * 100))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# Game records: the move list of a game plus metadata, logged one game per line and replayed on demand.
+#
+# A log file holds one JSON object per line. Each move is packed as square * 2, plus 1 when O moved, in one
+# byte up to 11x11 and two (big-endian) on larger boards, and hex encoded, so a 60-move 8x8 game takes 120
+# characters. GameLogWriter appends records through a buffer; GameLog indexes the line offsets once and
+# rebuilds any position of any game by replaying make_move, without drawing anything.
+import json
+
+from reversi.reversi_board import ReversiBoard
+
+PLAYER_SETTINGS = ("beamSearch", "killerMove", "transposition", "qui", "depth", "time_limit_ms", "workers",
+                   "endgame_empties", "symmetry")
+
+
+class GameRecord:
+
+    def __init__(self, size, moves, move_times_ns=None, start=None, metadata=None):
+        # moves: (symbol, [x, y]) in the order played; move_times_ns: get_move time per move;
+        # start: ReversiBoard.to_bytes() of the starting position if it was not the standard one
+        self.size = size
+        self.moves = moves
+        self.move_times_ns = move_times_ns or []
+        self.start = start
+        self.metadata = metadata or {}
+
+    def position(self, ply, bitboard=True):
+        # The board after the first ply moves
+        if self.start is None:
+            board = ReversiBoard(self.size, bitboard=bitboard)
+        else:
+            board = ReversiBoard.from_bytes(self.start, bitboard)[0]
+        for symbol, move in self.moves[:ply]:
+            board.make_move(symbol, move)
+        return board
+
+    def to_json_line(self):
+        width = move_bytes(self.size)
+        packed = b"".join(((move[0] * self.size + move[1]) * 2 + (symbol == 'O')).to_bytes(width, "big")
+                          for symbol, move in self.moves)
+        data = {"size": self.size, "moves": packed.hex(), "times_ns": self.move_times_ns, "meta": self.metadata}
+        if self.start is not None:
+            data["start"] = self.start.hex()
+        return json.dumps(data, separators=(",", ":")) + "\n"
+
+    @classmethod
+    def from_json_line(cls, line):
+        data = json.loads(line)
+        size = data["size"]
+        width = move_bytes(size)
+        packed = bytes.fromhex(data["moves"])
+        moves = []
+        for i in range(0, len(packed), width):
+            code = int.from_bytes(packed[i:i + width], "big")
+            square = code >> 1
+            moves.append(('O' if code & 1 else 'X', [square // size, square % size]))
+        start = bytes.fromhex(data["start"]) if "start" in data else None
+        return cls(size, moves, data["times_ns"], start, data["meta"])
+
+
+def move_bytes(size):
+    # Bytes per packed move on a size x size board
+    return 1 if size * size * 2 <= 256 else 2
+
+
+def describe_player(player):
+    # Metadata for a player: its class, symbol and whichever search settings it has
+    description = {"class": type(player).__name__, "symbol": player.symbol}
+    for name in PLAYER_SETTINGS:
+        if hasattr(player, name):
+            description[name] = getattr(player, name)
+    return description
+
+
+class GameLogWriter:
+    # Appends GameRecords to a log file, flushing every buffer_games games (and on close)
+
+    def __init__(self, path, buffer_games=64):
+        self._file = open(path, "a", encoding="utf-8")
+        self._buffer = []
+        self.buffer_games = buffer_games
+
+    def write(self, record):
+        self._buffer.append(record.to_json_line())
+        if len(self._buffer) >= self.buffer_games:
+            self.flush()
+
+    def flush(self):
+        self._file.write("".join(self._buffer))
+        self._file.flush()
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class GameLog:
+    # Random access to a log file: only the line offsets are kept in memory
+
+    def __init__(self, path):
+        self.path = path
+        self._offsets = []
+        with open(path, "rb") as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    self._offsets.append(offset)
+                offset += len(line)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        with open(self.path, "rb") as f:
+            f.seek(self._offsets[index])
+            return GameRecord.from_json_line(f.readline())
+
+    def __iter__(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield GameRecord.from_json_line(line)
+
+    def position(self, game_index, ply, bitboard=True):
+        # The board of game game_index after its first ply moves
+        return self[game_index].position(ply, bitboard)
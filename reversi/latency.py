@@ -0,0 +1,67 @@
+# Per-move latency records and percentile summaries for ReversiGame and compare_players.
+# Latencies are integer nanoseconds from time.perf_counter_ns.
+
+PHASES = ("opening", "midgame", "endgame")
+
+
+def game_phase(empties, squares):
+    # opening while less than a third of the board is filled, endgame once two thirds are
+    filled = squares - empties
+    if filled * 3 < squares:
+        return "opening"
+    if filled * 3 < squares * 2:
+        return "midgame"
+    return "endgame"
+
+
+class LatencyHistogram:
+
+    def __init__(self):
+        self.samples = []
+        self._sorted = True
+
+    def add(self, nanoseconds):
+        self.samples.append(nanoseconds)
+        self._sorted = False
+
+    def merge(self, other):
+        self.samples.extend(other.samples)
+        self._sorted = False
+
+    def percentile(self, percent):
+        # Nearest-rank percentile in nanoseconds (None if there are no samples)
+        if not self.samples:
+            return None
+        if not self._sorted:
+            self.samples.sort()
+            self._sorted = True
+        rank = max(1, -(-len(self.samples) * percent // 100))
+        return self.samples[int(rank) - 1]
+
+    def summary(self):
+        # count plus p50/p90/p99/max in milliseconds
+        result = {"count": len(self.samples)}
+        for name, percent in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100)):
+            value = self.percentile(percent)
+            result[name] = None if value is None else value / 1e6
+        return result
+
+
+def latency_histograms(records, symbols):
+    # Builds {symbol: {"all": histogram, phase: histogram, ...}} from (symbol, phase, nanoseconds) records
+    histograms = {symbol: {name: LatencyHistogram() for name in ("all",) + PHASES} for symbol in symbols}
+    for symbol, phase, nanoseconds in records:
+        histograms[symbol]["all"].add(nanoseconds)
+        histograms[symbol][phase].add(nanoseconds)
+    return histograms
+
+
+def print_latency_summary(histograms):
+    print("move latency (ms)    count      p50      p90      p99      max")
+    for symbol in histograms:
+        for name, histogram in histograms[symbol].items():
+            summary = histogram.summary()
+            if not summary["count"]:
+                continue
+            print("%s %-16s %7d %8.3f %8.3f %8.3f %8.3f" % (symbol, name, summary["count"], summary["p50"],
+                                                          summary["p90"], summary["p99"], summary["max"]))
@@ -29,10 +29,10 @@ def get_player_b(symbol):
 def get_player_c(symbol):
     """
     :author: Liam Pfaff
-    :enchancement: Quiescense to speed up the function
+    :enchancement: Quiescense search at the horizon
     :returns: an enhanced minimax player that can operate successfully on a given 8x8 board
-                calculates whether or not a given move will have a large change in score,
-                if not, it will not recursively calculate that move.
+                at the end of the search it keeps following the moves that take a corner, flip many discs
+                or force a pass, so positions in the middle of an exchange are not scored statically.
     """
     return MiniMaxPlayer(symbol, False, False, False, True)
 
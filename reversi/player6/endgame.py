@@ -0,0 +1,130 @@
+# Exact endgame solver for the last few empty squares.
+# Searches every line to the end of the game with alpha-beta and scores the final disc difference,
+# so the result is perfect play rather than a heuristic estimate.
+import time
+from functools import lru_cache
+
+from reversi.player6.transposition import TranspositionTable
+from reversi.player6.search import EXACT, LOWER, UPPER, INFINITY, TIME_CHECK_INTERVAL, SearchTimeout
+
+# Below this many empties move ordering costs more than it saves
+ORDERING_MIN_EMPTIES = 5
+
+
+class EndgameSolver:
+
+    def __init__(self, table_entries=2 ** 14):
+        # The solver has its own small table: its entries are exact results that never mix with heuristic scores
+        self.table = TranspositionTable(table_entries)
+        self.nodes = 0
+        self.deadline = None
+
+    def solve(self, board, symbol, exact=True, time_limit_ms=None):
+        # Returns [move, score] with score the final disc difference for symbol under perfect play.
+        # With exact=False only win (> 0), draw (0) or loss (< 0) is established, which is much faster.
+        # With time_limit_ms it raises SearchTimeout if the solve does not finish in time (board untouched).
+        opponent = board.get_opponent_symbol(symbol)
+        alpha, beta = (-INFINITY, INFINITY) if exact else (-1, 1)
+        if time_limit_ms is not None:
+            # A timeout leaves moves made on the copy, never on the caller's board
+            board = board.copy()
+            self.deadline = time.perf_counter() + time_limit_ms / 1000
+        try:
+            moves = self.ordered_moves(board, symbol, opponent)
+            best = [moves[0], -INFINITY]
+            for move in moves:
+                undo = board.make_move(symbol, move)
+                score = -self._solve(board, opponent, -beta, -alpha)
+                board.unmake_move(undo)
+                if score > best[1]:
+                    best = [move, score]
+                    if score > alpha:
+                        alpha = score
+                        if alpha >= beta:
+                            break
+        finally:
+            self.deadline = None
+        return best
+
+    def _solve(self, board, symbol, alpha, beta):
+        self.nodes += 1
+        if self.deadline is not None and self.nodes & (TIME_CHECK_INTERVAL - 1) == 0:
+            if time.perf_counter() >= self.deadline:
+                raise SearchTimeout()
+        opponent = board.get_opponent_symbol(symbol)
+        key = board.get_hash(symbol)
+        entry = self.table.probe(key)
+        if entry is not None:
+            entry_key, entry_depth, score, bound, move = entry
+            if bound == LOWER and score > alpha:
+                alpha = score
+            elif bound == UPPER and score < beta:
+                beta = score
+            if bound == EXACT or alpha >= beta:
+                return score
+
+        moves = self.ordered_moves(board, symbol, opponent)
+        if not moves:
+            if not board.calc_valid_moves(opponent):
+                scores = board.calc_scores()
+                return scores[symbol] - scores[opponent]
+            return -self._solve(board, opponent, -beta, -alpha)
+
+        alpha_start = alpha
+        best = -INFINITY
+        best_move = moves[0]
+        for move in moves:
+            undo = board.make_move(symbol, move)
+            score = -self._solve(board, opponent, -beta, -alpha)
+            board.unmake_move(undo)
+            if score > best:
+                best = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best <= alpha_start:
+            bound = UPPER
+        elif best >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table.store(key, board.get_empty_count(), best, bound, best_move)
+        return best
+
+    def ordered_moves(self, board, symbol, opponent):
+        # Fastest-first: moves that leave the opponent the fewest replies go first. Ties prefer moves in a
+        # quadrant with an odd number of empties (parity: the side that moves there also gets the last move).
+        moves = board.calc_valid_moves(symbol)
+        if len(moves) < 2 or board.get_empty_count() < ORDERING_MIN_EMPTIES:
+            return moves
+        parity = _quadrant_parity(board)
+        half = board.get_size() // 2
+        keyed = []
+        for move in moves:
+            undo = board.make_move(symbol, move)
+            mobility = len(board.calc_valid_moves(opponent))
+            board.unmake_move(undo)
+            keyed.append((mobility, not parity[move[0] >= half][move[1] >= half], move))
+        keyed.sort(key=lambda item: item[:2])
+        return [move for mobility, even, move in keyed]
+
+
+def _quadrant_parity(board):
+    # parity[top][left] is True when that quadrant has an odd number of empty squares
+    x_bits, o_bits = board.get_bitboards()
+    masks = _quadrant_masks(board.get_size())
+    occupied = x_bits | o_bits
+    return [[(mask & ~occupied).bit_count() % 2 == 1 for mask in row] for row in masks]
+
+
+@lru_cache(maxsize=None)
+def _quadrant_masks(size):
+    half = size // 2
+    masks = [[0, 0], [0, 0]]
+    for x in range(size):
+        for y in range(size):
+            masks[x >= half][y >= half] |= 1 << (x * size + y)
+    return masks
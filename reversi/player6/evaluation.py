@@ -0,0 +1,248 @@
+# Table-driven position evaluation for MiniMaxPlayer.
+#
+# A score is a weighted sum of terms, each computed from the board's bitboards and masks precomputed per
+# board size: disc difference, square weights (kept incrementally by the board, see set_weights), mobility,
+# frontier discs (next to an empty square) and edge-anchored stable discs. Weights can be fitted to the
+# outcomes of logged games (see reversi.game_record):
+#
+#   python -m reversi.player6.evaluation games.log weights8.json --min-ply 8
+import argparse
+import json
+from functools import lru_cache
+
+from reversi.game_record import GameLog
+
+CORNER_WEIGHT = 12
+EDGE_WEIGHT = 5
+
+
+class Evaluator:
+
+    def __init__(self, size, weights=None, subtract_opponent=True, disc=1, mobility=0, frontier=0, stability=0):
+        # weights: flat square-weight table (index x * size + y), corner_edge_weights(size) by default.
+        # It is added for each own disc and subtracted for each opponent disc. subtract_opponent=False scores own
+        # discs only, which makes the score not zero-sum and is wrong for negamax at odd depths.
+        # disc, mobility, frontier and stability multiply own minus opponent discs, valid moves, frontier
+        # discs and stable discs; terms with a 0 coefficient are not computed.
+        self.size = size
+        self.weights = corner_edge_weights(size) if weights is None else list(weights)
+        self.subtract_opponent = subtract_opponent
+        self.disc = disc
+        self.mobility = mobility
+        self.frontier = frontier
+        self.stability = stability
+
+    def evaluate(self, board, symbol):
+        # Score of the position for symbol
+        opponent = board.get_opponent_symbol(symbol)
+        if board.get_weights() is not self.weights:
+            board.set_weights(self.weights)
+        score = board.get_weight_sum(symbol)
+        if self.subtract_opponent:
+            score -= board.get_weight_sum(opponent)
+        if self.disc:
+            scores = board.calc_scores()
+            score += self.disc * (scores[symbol] - scores[opponent])
+        if self.mobility:
+            score += self.mobility * (board.count_valid_moves(symbol) - board.count_valid_moves(opponent))
+        if self.frontier or self.stability:
+            own, other = board.get_bitboards()
+            if symbol == 'O':
+                own, other = other, own
+            if self.frontier:
+                score += self.frontier * frontier_difference(own, other, self.size)
+            if self.stability:
+                score += self.stability * stability_difference(own, other, self.size)
+        return score
+
+    def to_dict(self):
+        return {"size": self.size, "weights": self.weights, "subtract_opponent": self.subtract_opponent,
+                "disc": self.disc, "mobility": self.mobility, "frontier": self.frontier,
+                "stability": self.stability}
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+
+def load_evaluator(path):
+    # An Evaluator saved with Evaluator.save (e.g. by fit_evaluator)
+    with open(path) as f:
+        return Evaluator(**json.load(f))
+
+
+@lru_cache(maxsize=None)
+def get_default_evaluator(size):
+    # Corner and edge weights for both sides, so that the score for X is minus the score for O as negamax needs
+    return Evaluator(size)
+
+
+@lru_cache(maxsize=None)
+def corner_edge_weights(size):
+    # CORNER_WEIGHT on the corners, EDGE_WEIGHT on the other edge squares, 0 inside
+    weights = []
+    for x in range(size):
+        for y in range(size):
+            if x in (0, size - 1) and y in (0, size - 1):
+                weights.append(CORNER_WEIGHT)
+            elif x in (0, size - 1) or y in (0, size - 1):
+                weights.append(EDGE_WEIGHT)
+            else:
+                weights.append(0)
+    return weights
+
+
+def frontier_difference(own, other, size):
+    # Own minus opponent discs that touch an empty square
+    near_empty = _neighbours(~(own | other) & ((1 << size * size) - 1), size)
+    return (own & near_empty).bit_count() - (other & near_empty).bit_count()
+
+
+def stability_difference(own, other, size):
+    # Own minus opponent stable discs, counting the discs that can never be flipped because they are joined
+    # to an occupied corner along an edge by discs of the same colour (a lower bound on true stability)
+    stable = {True: 0, False: 0}
+    for ray in _corner_rays(size):
+        if not (own | other) & ray[0]:
+            continue
+        is_own = bool(own & ray[0])
+        discs = own if is_own else other
+        for bit in ray:
+            if not discs & bit:
+                break
+            stable[is_own] |= bit
+    return stable[True].bit_count() - stable[False].bit_count()
+
+
+def _neighbours(bits, size):
+    # Squares next to (but not in) any square of bits
+    result = 0
+    for shift, mask in _neighbour_shifts(size):
+        result |= (bits << shift if shift > 0 else bits >> -shift) & mask
+    return result & ~bits
+
+
+@lru_cache(maxsize=None)
+def _neighbour_shifts(size):
+    # (shift, mask) per direction: shifting a bitboard moves every square one step that way and the mask drops
+    # the squares that wrapped around a row
+    shifts = []
+    full = (1 << size * size) - 1
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            if dx == 0 and dy == 0:
+                continue
+            mask = 0
+            for x in range(size):
+                for y in range(size):
+                    if 0 <= x - dx < size and 0 <= y - dy < size:
+                        mask |= 1 << (x * size + y)
+            shifts.append((dx * size + dy, mask & full))
+    return shifts
+
+
+@lru_cache(maxsize=None)
+def _corner_rays(size):
+    # The two edges from each corner as lists of square bits, starting with the corner
+    last = size - 1
+    rays = []
+    for x, y, dx, dy in ((0, 0, 0, 1), (0, 0, 1, 0), (0, last, 0, -1), (0, last, 1, 0),
+                         (last, 0, 0, 1), (last, 0, -1, 0), (last, last, 0, -1), (last, last, -1, 0)):
+        rays.append([1 << ((x + i * dx) * size + y + i * dy) for i in range(size)])
+    return rays
+
+
+@lru_cache(maxsize=None)
+def square_classes(size):
+    # Class of every square under the board's rotations and reflections, and the number of classes.
+    # Fitting one weight per class keeps the table symmetric and the number of unknowns small.
+    classes = {}
+    indexes = []
+    for x in range(size):
+        for y in range(size):
+            near = sorted((min(x, size - 1 - x), min(y, size - 1 - y)))
+            indexes.append(classes.setdefault(tuple(near), len(classes)))
+    return indexes, len(classes)
+
+
+def position_features(board, size):
+    # X minus O for each square class, mobility, frontier and stability, in that order
+    indexes, count = square_classes(size)
+    x_bits, o_bits = board.get_bitboards()
+    features = [0] * (count + 3)
+    for square in range(size * size):
+        if x_bits >> square & 1:
+            features[indexes[square]] += 1
+        elif o_bits >> square & 1:
+            features[indexes[square]] -= 1
+    features[count] = board.count_valid_moves('X') - board.count_valid_moves('O')
+    features[count + 1] = frontier_difference(x_bits, o_bits, size)
+    features[count + 2] = stability_difference(x_bits, o_bits, size)
+    return features
+
+
+def fit_evaluator(records, size=None, min_ply=0, ridge=1.0):
+    # Least-squares fit of an Evaluator to game records: every position from ply min_ply on is a sample whose
+    # target is the game's final disc difference. Returns the Evaluator (subtract_opponent, no separate disc
+    # term: the square weights include it).
+    rows = []
+    targets = []
+    for record in records:
+        if size is None:
+            size = record.size
+        if record.size != size:
+            continue
+        board = record.position(0)
+        samples = []
+        for ply, (symbol, move) in enumerate(record.moves):
+            if ply >= min_ply:
+                samples.append(position_features(board, size))
+            board.make_move(symbol, move)
+        scores = board.calc_scores()
+        rows.extend(samples)
+        targets.extend([scores['X'] - scores['O']] * len(samples))
+    if not rows:
+        raise ValueError("no positions to fit")
+    coefficients = _least_squares(rows, targets, ridge)
+    indexes, count = square_classes(size)
+    return Evaluator(size, [coefficients[index] for index in indexes], subtract_opponent=True, disc=0,
+                     mobility=coefficients[count], frontier=coefficients[count + 1],
+                     stability=coefficients[count + 2])
+
+
+def _least_squares(rows, targets, ridge):
+    # Solves (A^T A + ridge I) w = A^T b by Gaussian elimination; there are only a few dozen unknowns
+    n = len(rows[0])
+    normal = [[ridge if i == j else 0.0 for j in range(n)] + [0.0] for i in range(n)]
+    for row, target in zip(rows, targets):
+        for i in range(n):
+            if row[i]:
+                normal_row = normal[i]
+                for j in range(n):
+                    normal_row[j] += row[i] * row[j]
+                normal_row[n] += row[i] * target
+    for column in range(n):
+        pivot = max(range(column, n), key=lambda i: abs(normal[i][column]))
+        normal[column], normal[pivot] = normal[pivot], normal[column]
+        for i in range(n):
+            if i != column and normal[i][column]:
+                factor = normal[i][column] / normal[column][column]
+                normal[i] = [a - factor * b for a, b in zip(normal[i], normal[column])]
+    return [normal[i][n] / normal[i][i] for i in range(n)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit evaluation weights to logged Reversi games")
+    parser.add_argument("log", help="game log written by compare_players(log_path=...)")
+    parser.add_argument("output")
+    parser.add_argument("--size", type=int, default=None)
+    parser.add_argument("--min-ply", type=int, default=0)
+    parser.add_argument("--ridge", type=float, default=1.0)
+    args = parser.parse_args(argv)
+    evaluator = fit_evaluator(GameLog(args.log), args.size, args.min_ply, args.ridge)
+    evaluator.save(args.output)
+    print("weights for %dx%d written to %s" % (evaluator.size, evaluator.size, args.output))
+
+
+if __name__ == "__main__":
+    main()
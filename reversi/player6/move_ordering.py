@@ -0,0 +1,79 @@
+# Move ordering for AlphaBetaSearch: the earlier the best move is tried, the more alpha-beta prunes.
+# Moves are sorted by killer moves first (moves that caused a cutoff at the same ply in a sibling node), then
+# a static square class (corners first, the X-squares diagonally next to a corner last), then the history
+# table (how often and how deep a move on that square caused a cutoff for that side). The search puts the
+# transposition table move and the principal variation move in front of all of these.
+from functools import lru_cache
+
+# Killer moves remembered per ply
+KILLER_SLOTS = 2
+
+CORNER = 0
+OTHER_SQUARE = 1
+X_SQUARE = 2
+
+
+class MoveOrdering:
+
+    def __init__(self, killers=True, history=True):
+        self.use_killers = killers
+        self.use_history = history
+        # killers[ply]: up to KILLER_SLOTS moves, most recent first
+        self.killers = []
+        # history[symbol][square]: sum of depth * depth over the cutoffs of that move
+        self.history = {'X': [], 'O': []}
+
+    def order(self, size, symbol, moves, ply):
+        classes = ordering_classes(size)
+        killers = self.killers_at(ply)
+        history = self._history(size)[symbol]
+        return sorted(moves, key=lambda move: (move not in killers, classes[move[0] * size + move[1]],
+                                               -history[move[0] * size + move[1]]))
+
+    def killers_at(self, ply):
+        if ply < len(self.killers):
+            return self.killers[ply]
+        return []
+
+    def record_cutoff(self, size, symbol, move, ply, depth):
+        # move made the node at ply (searched depth plies deep) fail high
+        if self.use_killers:
+            while len(self.killers) <= ply:
+                self.killers.append([])
+            slots = self.killers[ply]
+            if move not in slots:
+                slots.insert(0, move)
+                del slots[KILLER_SLOTS:]
+        if self.use_history:
+            self._history(size)[symbol][move[0] * size + move[1]] += depth * depth
+
+    def age(self):
+        # Halves the history scores so that cutoffs from earlier searches count less than new ones
+        for scores in self.history.values():
+            for square in range(len(scores)):
+                scores[square] >>= 1
+
+    def clear(self):
+        self.killers = []
+        self.history = {'X': [], 'O': []}
+
+    def _history(self, size):
+        if len(self.history['X']) != size * size:
+            self.history = {'X': [0] * (size * size), 'O': [0] * (size * size)}
+        return self.history
+
+
+@lru_cache(maxsize=None)
+def ordering_classes(size):
+    # Static ordering class per square (index x * size + y): CORNER, X_SQUARE or OTHER_SQUARE
+    last = size - 1
+    classes = []
+    for x in range(size):
+        for y in range(size):
+            if x in (0, last) and y in (0, last):
+                classes.append(CORNER)
+            elif x in (1, last - 1) and y in (1, last - 1):
+                classes.append(X_SQUARE)
+            else:
+                classes.append(OTHER_SQUARE)
+    return classes
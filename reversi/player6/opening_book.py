@@ -0,0 +1,140 @@
+# Opening book: best moves for early positions, computed offline and looked up instead of searched.
+#
+# The book file is a small header followed by fixed-size (position hash, move, score) records sorted
+# by hash. Positions are stored in canonical form (see ReversiBoard.get_canonical_hash), so one record
+# covers all 8 rotations and reflections of a position. Lookups memory-map the file and binary search it,
+# so a book costs almost no memory per process and opens instantly.
+#
+#   python -m reversi.player6.opening_book book8.bin --size 8 --plies 12 --games 200 --depth 6
+import argparse
+import mmap
+import random
+import struct
+
+from reversi.reversi_board import ReversiBoard, transform_move, untransform_move
+from reversi.player6.search import AlphaBetaSearch
+
+MAGIC = b"RVBK"
+VERSION = 2
+# magic, version, board size, record count
+HEADER = struct.Struct("<4sHHI")
+# canonical position hash (side to move mixed in), move square (x * size + y) on the canonical position,
+# score for the side to move
+RECORD = struct.Struct("<QHh")
+
+
+class OpeningBook:
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("%s is not a version %d opening book" % (path, VERSION))
+
+    def probe(self, key):
+        # Returns (move square, score) stored for the hash, or None
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            record_key, square, score = RECORD.unpack_from(self._map, HEADER.size + middle * RECORD.size)
+            if record_key < key:
+                low = middle + 1
+            elif record_key > key:
+                high = middle
+            else:
+                return square, score
+        return None
+
+    def lookup(self, board, symbol):
+        # Returns the book move [x, y] for symbol, or None if the position is not in the book
+        if board.get_size() != self.size:
+            return None
+        key, transform = board.get_canonical_hash(symbol)
+        found = self.probe(key)
+        if found is None:
+            return None
+        move = untransform_move([found[0] // self.size, found[0] % self.size], transform, self.size)
+        # A hash collision could name an illegal move
+        if not board.is_valid_move(symbol, move):
+            return None
+        return move
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __len__(self):
+        return self.count
+
+    def __getstate__(self):
+        # Pickled copies (e.g. players sent to worker processes) map the file again
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+
+def write_book(path, size, entries):
+    # entries: {position hash: (move square, score)}
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, size, len(entries)))
+        for key in sorted(entries):
+            square, score = entries[key]
+            f.write(RECORD.pack(key, square, max(-32768, min(32767, round(score)))))
+
+
+def build_book(path, player, size=8, plies=12, games=100, depth=6, deviation=0.3, seed=0):
+    # Self-play with the player's evaluation and enhancements: every position in the first plies moves is
+    # searched depth plies deep and its best move stored. With probability deviation a random move is played
+    # instead of the best one, so the games cover the likely replies and not a single line. Games alternate
+    # which side moves first (ReversiGame lets either colour open), so the book covers both.
+    rng = random.Random(seed)
+    search = AlphaBetaSearch(player.move_score, player.beamSearch, False, True, player.qui)
+    entries = {}
+    for game in range(games):
+        board = ReversiBoard(size)
+        board.enable_symmetry()
+        symbol = "X" if game % 2 == 0 else "O"
+        for ply in range(plies):
+            moves = board.calc_valid_moves(symbol)
+            if not moves:
+                symbol = board.get_opponent_symbol(symbol)
+                if not board.calc_valid_moves(symbol):
+                    break
+                continue
+            key, transform = board.get_canonical_hash(symbol)
+            if key not in entries:
+                move, score = search.search(board, symbol, depth)
+                move = transform_move(move, transform, size)
+                entries[key] = (move[0] * size + move[1], score)
+            square = entries[key][0]
+            if rng.random() < deviation:
+                move = rng.choice(moves)
+            else:
+                move = untransform_move([square // size, square % size], transform, size)
+            board.make_move(symbol, move)
+            symbol = board.get_opponent_symbol(symbol)
+    write_book(path, size, entries)
+    return len(entries)
+
+
+def main(argv=None):
+    from reversi.player6.all_players import get_default_player
+    parser = argparse.ArgumentParser(description="Build a Reversi opening book by self-play")
+    parser.add_argument("path")
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--plies", type=int, default=12)
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--deviation", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    count = build_book(args.path, get_default_player("X"), args.size, args.plies, args.games, args.depth,
+                       args.deviation, args.seed)
+    print(count, "positions written to", args.path)
+
+
+if __name__ == "__main__":
+    main()
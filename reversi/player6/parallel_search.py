@@ -0,0 +1,116 @@
+# Root-parallel search for a single decision.
+# The root moves are dealt round-robin to worker processes; each worker searches its share with its own
+# copy of the player's AlphaBetaSearch and the best result over all workers is played.
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from reversi.player6.search import SearchStats
+
+
+class RootParallelSearch:
+
+    def __init__(self, player, workers, measure_speedup=False):
+        # player is the MiniMaxPlayer whose search (evaluation and enhancements) the workers run.
+        # measure_speedup also searches every root in this process, at the depth the workers' result came
+        # from, and sets last_serial_time and speedup. That doubles the cost of a search: use it to measure.
+        # (With a time limit the workers' wall time includes the deeper iteration they did not finish.)
+        self.player = player
+        self.workers = workers
+        self.measure_speedup = measure_speedup
+        self._executor = None
+        # The single-process search measure_speedup compares against; like the workers' copies it starts from
+        # the player as it was and keeps its tables from search to search
+        self._serial = None
+        # Nodes searched by the workers over all searches, like AlphaBetaSearch.nodes
+        self.nodes = 0
+        # Depth the played move was compared at by the last search
+        self.completed_depth = 0
+        # Filled in by every search: wall time, CPU time summed over the workers, and their ratio to the wall
+        # time. The ratio is how busy the workers kept the cores (utilization), not a speedup: the split search
+        # prunes less than one process searching all the moves, so it does more work in total.
+        self.last_wall_time = None
+        self.last_worker_time = None
+        self.utilization = None
+        # With measure_speedup: wall time of the same search in one process, and its ratio to last_wall_time
+        self.last_serial_time = None
+        self.speedup = None
+
+    def search(self, board, symbol, depth, time_limit_ms=None, moves=None, stats=None):
+        # Returns [move, score] like AlphaBetaSearch.search. With time_limit_ms every worker deepens
+        # iteratively over its own moves, up to depth plies (None for no cap), and the workers' moves are
+        # compared at the deepest depth all of them finished; score is None if some worker finished none.
+        # moves are symbol's valid moves if the caller already has them. The workers' counters are added to
+        # stats (a SearchStats) if given.
+        moves = self.player.search.ordered_moves(board, symbol, moves)
+        groups = [moves[i::self.workers] for i in range(min(self.workers, len(moves)))]
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(self.player,))
+        start = time.perf_counter()
+        futures = [self._executor.submit(_search_root_moves, board, symbol, group, depth, time_limit_ms,
+                                         stats is not None)
+                   for group in groups]
+        results = [future.result() for future in futures]
+        self.last_wall_time = time.perf_counter() - start
+        self.last_worker_time = sum(result[1] for result in results)
+        self.utilization = self.last_worker_time / self.last_wall_time if self.last_wall_time else None
+        self.nodes += sum(result[2] for result in results)
+        if stats is not None:
+            for result in results:
+                stats.add(result[3])
+
+        # A score from a deeper search is not comparable with a shallower one
+        finished = min(len(result[0]) for result in results)
+        self.completed_depth = finished if time_limit_ms is not None else depth
+        if finished == 0:
+            return [moves[0], None]
+        if self.measure_speedup:
+            self._measure_serial(board, symbol, moves)
+        best = None
+        for depth_results, elapsed, nodes, worker_stats in results:
+            move, score = depth_results[finished - 1]
+            # Ties go to the move that came first in the move ordering
+            if best is None or score > best[1] or (score == best[1] and moves.index(move) < moves.index(best[0])):
+                best = [move, score]
+        return best
+
+    def _measure_serial(self, board, symbol, moves):
+        if self._serial is None:
+            self._serial = pickle.loads(pickle.dumps(self.player)).search
+            self._serial.stats = None
+        start = time.perf_counter()
+        self._serial.search(board.copy(), symbol, self.completed_depth, moves)
+        self.last_serial_time = time.perf_counter() - start
+        self.speedup = self.last_serial_time / self.last_wall_time if self.last_wall_time else None
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+# The player this worker process searches with (set once by the pool initializer)
+_worker = {}
+
+
+def _init_worker(player):
+    _worker["player"] = player
+
+
+def _search_root_moves(board, symbol, moves, depth, time_limit_ms, record_stats):
+    # ([move, score] per finished depth, CPU time, nodes, SearchStats or None); without a time limit only
+    # depth is searched
+    search = _worker["player"].search
+    search.stats = SearchStats() if record_stats else None
+    start = time.process_time()
+    nodes = search.nodes
+    try:
+        if time_limit_ms is not None:
+            search.iterative_deepening(board, symbol, time_limit_ms, depth, moves)
+            depth_results = search.depth_results
+        else:
+            depth_results = [search.search(board, symbol, depth, moves)]
+    finally:
+        stats, search.stats = search.stats, None
+    return depth_results, time.process_time() - start, search.nodes - nodes, stats
@@ -1,6 +1,21 @@
 # adapted by Toby Dragon from original source code by Al Sweigart, available with creative commons license: https://inventwithpython.com/#donate
+import json
 import random
-import copy
+import time
+from reversi.reversi_board import transform_move, untransform_move
+from reversi.player6.endgame import EndgameSolver
+from reversi.player6.evaluation import get_default_evaluator, load_evaluator
+from reversi.player6.opening_book import OpeningBook
+from reversi.player6.parallel_search import RootParallelSearch
+from reversi.player6.search import INFINITY, AlphaBetaSearch, SearchStats, SearchTimeout
+from reversi.player6.search_cache import SearchCache
+
+
+# Empty squares at which the endgame solver takes over on 8x8. Smaller boards scale it by their area (2 on 4x4,
+# 5 on 6x6); larger boards keep it, since solve time grows with the empties and not the board.
+ENDGAME_EMPTIES_8X8 = 10
+# Share of a move's time limit the endgame solver may use before the search takes over
+ENDGAME_TIME_SHARE = 0.5
 
 
 class HumanPlayer:
@@ -8,7 +23,7 @@ class HumanPlayer:
     def __init__(self, symbol):
         self.symbol = symbol
 
-    def get_move(self, board):
+    def get_move(self, board, moves=None):
         # Let the player type in their move.
         # Returns the move as [x, y] (or returns the strings 'hints' or 'quit')
         valid_digits = []
@@ -34,8 +49,11 @@ class RandomComputerPlayer:
     def __init__(self, symbol):
         self.symbol = symbol
 
-    def get_move(self, board):
-        return random.choice(board.calc_valid_moves(self.symbol))
+    def get_move(self, board, moves=None):
+        # moves: the valid moves for this player if the caller already generated them
+        if moves is None:
+            moves = board.calc_valid_moves(self.symbol)
+        return random.choice(moves)
 
 
 class GreedyPlayer:
@@ -44,14 +62,14 @@ class GreedyPlayer:
 
     # Greedy agent to maximize utility of each available move and decide which to take
 
-    def get_move(self, board):
-        choices = board.calc_valid_moves(self.symbol)
+    def get_move(self, board, moves=None):
+        choices = board.calc_valid_moves(self.symbol) if moves is None else moves
         next_score = 0
         move = choices[0]
         for i in choices:
-            testboard = board
-            testboard.make_move(self.symbol, i)
-            score = testboard.calc_scores()
+            undo = board.make_move(self.symbol, i)
+            score = board.calc_scores()
+            board.unmake_move(undo)
             if score.get(self.symbol) > next_score:
                 next_score = score.get(self.symbol)
                 move = i
@@ -60,416 +78,207 @@ class GreedyPlayer:
 
 
 class MiniMaxPlayer:
-    # Minimax agent that calculates 5 levels
-    def __init__(self, symbol, beamSearch, killerMove, transposition, qui):
-        self.symbol = symbol
-        self.beamSearch = beamSearch
-        self.killerMove = killerMove
-        self.transposition = transposition
-        self.qui = qui
-        self.table = TranspositionTable()
-
-    def quiCalc(self, boardBefore, boardAfter):
-        scoresBefore = boardBefore.calc_scores()
-        scoresAfter = boardAfter.calc_scores()
-        bscore1 = scoresBefore.get('X')
-        bscore2 = scoresBefore.get('O')
-        ascore1 = scoresAfter.get('X')
-        ascore2 = scoresAfter.get('O')
-        return abs(abs(ascore1 - ascore2) - abs(bscore1 - bscore2))
-
-    def move_score(self, board):
-        score = board.calc_scores().get(self.symbol) - board.calc_scores().get(board.get_opponent_symbol(self.symbol))
-        size = board.get_size() - 1
-        for x in range(0, size):
-            for y in range(0, size):
-                pos = x, y
-                if board.get_symbol_for_position(pos) == self.symbol:
-                    if pos == [0, 0] or pos == [0, size] or pos == [size, 0] or pos == [size, size]:
-                        score += 12
-                    elif x == 0 or x == size or y == 0 or y == size:
-                        score += 5
-        return score
-
-    # Returns move with min or max score
-    def find_max_score_in_list(self, moves_list):
-        score = moves_list[0][1]
-        move = moves_list[0][0]
-        for i in moves_list:
-            if i[1] > score:
-                score = i[1]
-                move = i[0]
-        return [move, score]
-
-    def find_min_score_in_list(self, moves_list):
-        score = moves_list[0][1]
-        move = moves_list[0][0]
-        for i in moves_list:
-            if i[1] < score:
-                score = i[1]
-                move = i[0]
-        return [move, score]
-
-    def transpositiontable(self, board):
-        newtable = TranspositionTable()
-        newtable.board_to_table(board)
-        return self.table.seen_board(newtable)
-
-    # Calculate n moves ahead, then use greedy algorithm to assign a value
-    def get_move_recursive(self, board, opposite, curr_depth, move):
-        if opposite:
-            player = self.symbol
-        else:
-            if self.symbol == "X":
-                player = "O"
-            else:
-                player = "X"
-
-        # Get all moves available
-        if self.beamSearch:
-            moves = self.beam_search(board)
-        else:
-            moves = board.calc_valid_moves(player)
-        # print(moves)
-        movesdict = []
-        # Base case reached bottom
-        # Return max score if opposite = true
-        if curr_depth < 1 or len(moves) < 2:
-            if len(moves) == 0:
-                return [move, self.move_score(board)]
-            for i in moves:
-                newboard = board
-                newboard.make_move(player, i)
-
-                if self.transposition:
-                    if self.transpositiontable(newboard):
-                        if opposite:
-                            return [i, board.calc_scores()[self.symbol]]
-                        else:
-                            return [i, board.calc_scores()[board.get_opponent_symbol(self.symbol)]]
-                    else:
-                        score = self.move_score(newboard)
-                        if self.killerMove:
-                            bonus = KillerMove(self.symbol).check_if_killer_move(newboard, i)
-                            if bonus is not None:
-                                score = score + bonus
-                        movesdict.append([i, score])
-                else:
-                    score = self.move_score(newboard)
-                    if self.killerMove:
-                        bonus = KillerMove(self.symbol).check_if_killer_move(newboard, i)
-                        if bonus is not None:
-                            score = score + bonus
-                    movesdict.append([i, score])
-
-            # Return move with correct score
-            if opposite:
-                return self.find_max_score_in_list(movesdict)
-
-            else:
-                return self.find_min_score_in_list(movesdict)
-
-        # Call recursive function on board with moves made
-        # Send with switched player
-        for i in moves:
-            quiBoard = copy.deepcopy(board)
-            newboard = copy.deepcopy(board)
-            newboard.make_move(player, i)
-            # If quiescense, add moves to movesdict without calling recursive on them
-            # Then call recursive on the rest
-            qscore = 0
-            if self.qui:
-                # Check quiescense on move
-                qscore = self.quiCalc(quiBoard, newboard)
-                # Small change in state, add moves with heuristic
-                if qscore < 5:
-                    movesdict.append([i, self.move_score(newboard)])
-
-            # Large state change, or quiescense turned of
-            if not self.qui or qscore >= 5:
-                if self.transposition:
-                    if self.transpositiontable(newboard):
-                        if opposite:
-                            return [i, board.calc_scores()[self.symbol]]
-                        else:
-                            return [i, board.calc_scores()[board.get_opponent_symbol(self.symbol)]]
-                    else:
-                        move_value = self.get_move_recursive(newboard, not opposite, curr_depth - 1, i)
-                        if self.killerMove:
-                            bonus = KillerMove(self.symbol).check_if_killer_move(newboard, i)
-                            if bonus is not None:
-                                move_value[1] = move_value[1] + bonus
-                        movesdict.append([i, move_value[1]])
-                else:
-                    move_value = self.get_move_recursive(newboard, not opposite, curr_depth - 1, i)
-                    if self.killerMove:
-                        bonus = KillerMove(self.symbol).check_if_killer_move(newboard, i)
-                        if bonus is not None:
-                            move_value[1] = move_value[1] + bonus
-                    movesdict.append([i, move_value[1]])
-
-            # Return min or max move depending on symbol
-            if opposite:
-                return self.find_max_score_in_list(movesdict)
-            else:
-                return self.find_min_score_in_list(movesdict)
-
-    def beam_search(self, board):
-        moves = board.calc_valid_moves(self.symbol)
-
-        if len(moves) > 3:
-            size = int(len(moves) / 2)
-        else:
-            return moves
-
-        bestmoves = []
-        scores = {}
-        i = 0
-
-        for move in moves:
-            newboard = copy.deepcopy(board)
-            newboard.make_move(self.symbol, move)
-            scores[i] = self.move_score(newboard)
-            i += 1
-
-        for i in range(0, size):
-            indx = max(scores, key=scores.get)
-            bestmoves.append(moves[indx])
-            scores.pop(indx)
-
-        return bestmoves
-
-    def get_move(self, board):
-        # Check list from recursive function and make move
-        moves = board.calc_valid_moves(self.symbol)
-        move = self.get_move_recursive(board, True, 4, moves[0])
-        return move[0]
-
-
-class MiniMaxPlayer2:
-    # Minimax agent that calculates 5 levels
-    def __init__(self, symbol, beamSearch, killerMove, transposition, qui):
+    # Minimax agent: negamax with alpha-beta pruning, searching depth plies.
+    # beamSearch is True (keep the better half of the moves at each node), a number of moves or a fraction.
+    # qui is True (or a number of plies) to extend the search along volatile moves past depth.
+    # With time_limit_ms it deepens iteratively (up to depth plies, None for no cap) until the time runs out.
+    # With workers > 1 the root moves are split across that many processes, which close() stops.
+    # batch_eval scores the leaves below each node together with NumPy. It is off by default because it is
+    # slower on boards up to 10x10: the leaves are no longer pruned (see batch_eval.py).
+    # With stats, last_stats holds a SearchStats for the latest get_move.
+    # Once endgame_empties or fewer squares are empty it plays perfectly with EndgameSolver (0 turns it off,
+    # None scales ENDGAME_EMPTIES_8X8 to the board's area). With time_limit_ms the solver gets
+    # ENDGAME_TIME_SHARE of the time and the search falls back to searching if it does not finish.
+    # book is an OpeningBook (or the path of a book file) consulted before searching.
+    # symmetry shares transposition table entries between rotated and reflected positions.
+    # evaluator is an Evaluator (or the path of a saved one) for boards of its size; other sizes, and all
+    # boards by default, are scored with get_default_evaluator. batch_eval needs an evaluator made of square
+    # weights and disc difference only (mobility, frontier and stability have no batch version).
+    # cache is a SearchCache (or the path of its database): positions this configuration has searched before,
+    # in this or an earlier run, are answered from it.
+    def __init__(self, symbol, beamSearch, killerMove, transposition, qui, depth=4, time_limit_ms=None,
+                 workers=1, batch_eval=False, stats=False, endgame_empties=None, book=None, symmetry=False,
+                 evaluator=None, cache=None):
         self.symbol = symbol
         self.beamSearch = beamSearch
         self.killerMove = killerMove
         self.transposition = transposition
         self.qui = qui
-        self.table = TranspositionTable()
-
-    def move_score(self, board):
-        score = board.calc_scores().get(self.symbol) - board.calc_scores().get(board.get_opponent_symbol(self.symbol))
-        size = board.get_size() - 1
-        for x in range(0, size):
-            for y in range(0, size):
-                pos = x, y
-                if board.get_symbol_for_position(pos) == self.symbol:
-                    if pos == [0, 0] or pos == [0, size] or pos == [size, 0] or pos == [size, size]:
-                        score += 12
-                    elif x == 0 or x == size or y == 0 or y == size:
-                        score += 5
-        return score
-
-    # Returns move with min or max score
-    def find_max_score_in_list(self, moves_list):
-        score = moves_list[0][1]
-        move = moves_list[0][0]
-        for i in moves_list:
-            if i[1] > score:
-                score = i[1]
-                move = i[0]
-        return [move, score]
-
-    def find_min_score_in_list(self, moves_list):
-        score = moves_list[0][1]
-        move = moves_list[0][0]
-        for i in moves_list:
-            if i[1] < score:
-                score = i[1]
-                move = i[0]
-        return [move, score]
-
-    def transpositiontable(self, board):
-        newtable = TranspositionTable()
-        newtable.board_to_table(board)
-        return self.table.seen_board(newtable)
-
-    # Calculate n moves ahead, then use greedy algorithm to assign a value
-    def get_move_recursive(self, board, opposite, curr_depth, move):
-        if opposite:
-            player = self.symbol
-        else:
-            if self.symbol == "X":
-                player = "O"
-            else:
-                player = "X"
-
-        # Get all moves available
-        if self.beamSearch:
-            moves = self.beam_search(board)
-        else:
-            moves = board.calc_valid_moves(player)
-        # print(moves)
-        movesdict = []
-        # Base case reached bottom
-        # Return max score if opposite = true
-        if curr_depth < 1 or len(moves) < 2:
-            if len(moves) == 0:
-                return [move, self.move_score(board)]
-            for i in moves:
-                newboard = board
-                newboard.make_move(player, i)
-
-                if self.transposition:
-                    if self.transpositiontable(newboard):
-                        if opposite:
-                            return [i, board.calc_scores()[self.symbol]]
-                        else:
-                            return [i, board.calc_scores()[board.get_opponent_symbol(self.symbol)]]
-                    else:
-                        score = self.move_score(board)
-                        movesdict.append([i, score])
-                else:
-                    score = self.move_score(board)
-                    movesdict.append([i, score])
-
-            # Return move with correct score
-            if opposite:
-                return self.find_max_score_in_list(movesdict)
-
-            else:
-                return self.find_min_score_in_list(movesdict)
-
-        # Call recursive function on board with moves made
-        # Send with switched player
-        for i in moves:
-
-            newboard = board
-            newboard.make_move(player, i)
-            if self.transposition:
-                if self.transpositiontable(newboard):
-                    if opposite:
-                        return [i, board.calc_scores()[self.symbol]]
-                    else:
-                        return [i, board.calc_scores()[board.get_opponent_symbol(self.symbol)]]
-                else:
-                    move_value = self.get_move_recursive(newboard, not opposite, curr_depth - 1, i)
-                    movesdict.append([i, move_value[1]])
-            else:
-                move_value = self.get_move_recursive(newboard, not opposite, curr_depth - 1, i)
-                movesdict.append([i, move_value[1]])
-
-            # Return min or max move depending on symbol
-            if opposite:
-                return self.find_max_score_in_list(movesdict)
-            else:
-                return self.find_min_score_in_list(movesdict)
-
-    def beam_search(self, board):
-        moves = board.calc_valid_moves(self.symbol)
-
-        if len(moves) > 3:
-            size = int(len(moves) / 2)
-        else:
-            return moves
-
-        bestmoves = []
-        scores = {}
-        i = 0
-
-        for move in moves:
-            newboard = copy.deepcopy(board)
-            newboard.make_move(self.symbol, move)
-            scores[i] = self.move_score(newboard)
-            i += 1
-
-        for i in range(0, size):
-            indx = max(scores, key=scores.get)
-            bestmoves.append(moves[indx])
-            scores.pop(indx)
-
-        return bestmoves
-
-    def get_move(self, board):
-        # Check list from recursive function and make move
-        moves = board.calc_valid_moves(self.symbol)
-        move = self.get_move_recursive(board, True, 400, moves[0])
-        return move[0]
-
-
-class TranspositionTable:
-
-    def __init__(self):
-        self.table = {}
-
-    def board_to_table(self, board):
+        self.depth = depth
+        self.time_limit_ms = time_limit_ms
+        self.workers = workers
+        self.batch_eval = batch_eval
+        self.symmetry = symmetry
+        self.parallel = None
+        self.stats = stats
+        self.last_stats = None
+        self.endgame_empties = endgame_empties
+        self.endgame = EndgameSolver()
+        # Plies searched (or empties solved) for the latest move, 0 if it came from the book or the cache
+        self.last_depth = 0
+        if isinstance(book, str):
+            book = OpeningBook(book)
+        self.book = book
+        if isinstance(evaluator, str):
+            evaluator = load_evaluator(evaluator)
+        if batch_eval and evaluator is not None and (evaluator.disc != 1 or evaluator.mobility or evaluator.frontier
+                                                     or evaluator.stability):
+            raise ValueError("batch_eval only supports evaluators with disc=1 and no mobility, frontier or "
+                             "stability terms")
+        self.evaluator = evaluator
+        self._batch_evaluator = None
+        if isinstance(cache, str):
+            cache = SearchCache(cache)
+        self.cache = cache
+        self.cache_config = self.config_string()
+        batch_evaluate = None
+        if batch_eval:
+            # Fails here, not in the middle of a search, when NumPy is not installed
+            import reversi.player6.batch_eval
+            batch_evaluate = self.batch_leaf_scores
+        self.search = AlphaBetaSearch(self.move_score, beamSearch, killerMove, transposition, qui,
+                                      batch_evaluate=batch_evaluate, symmetry=symmetry)
+
+    def move_score(self, board, symbol=None):
+        # The evaluator's score for symbol (this player by default): with the default evaluator, disc difference
+        # plus 12 for each corner and 5 for each other edge square symbol holds, minus the same for the opponent.
+        if symbol is None:
+            symbol = self.symbol
+        return self.evaluator_for(board.get_size()).evaluate(board, symbol)
+
+    def evaluator_for(self, size):
+        if self.evaluator is None or self.evaluator.size != size:
+            return get_default_evaluator(size)
+        return self.evaluator
+
+    def batch_leaf_scores(self, board, symbol, moves):
+        # The batch version of move_score. NumPy is only needed by players that use batch evaluation.
+        from reversi.player6.batch_eval import BatchEvaluator, get_batch_evaluator
         size = board.get_size()
-        current_row = ""
-        self.table = {}
-        for i in range(size):
-            for k in range(size):
-                current_pos = [i, k]
-                current_symbol = board.get_symbol_for_position(current_pos)
-                if current_symbol == "X":
-                    current_row += "X"
-                elif current_symbol == "O":
-                    current_row += "O"
-                else:
-                    current_row += " "
-            self.table[current_row] = True
-            current_row = ""
-
-    def seen_board(self, compare_table):
-        compare = compare_table.table.keys()
-        seen_states = self.table.keys()
-
-        seen = True
-
-        for i in compare:
-            if i not in seen_states:
-                seen = False
-        return seen
-
-
-class KillerMove:
-    def __init__(self, symbol):
-        self.symbol = symbol
-
-    def check_if_killer_move(self, board, move):
-        valid_digits = []
-        copy_board = copy.deepcopy(board)
-        copy_board.make_move(self.symbol, move)
-        opponent_symbol = board.get_opponent_symbol(self.symbol)
-        for i in range(board.get_size()):
-            valid_digits.append(i)
-
-        if move[0] == valid_digits[0] and move[1] == valid_digits[0]:
-            return 8
-
-        elif move[0] == valid_digits[0] and move[1] == valid_digits[-1]:
-            return 8
-
-        elif move[0] == valid_digits[-1] and move[1] == valid_digits[0]:
-            return 8
-
-        elif move[0] == valid_digits[-1] and move[1] == valid_digits[-1]:
-            return 8
-
-        elif self.find_max_move(board, opponent_symbol) > self.find_max_move(copy_board, opponent_symbol):
-            return 8
-        return None
+        evaluator = self.evaluator_for(size)
+        if evaluator is not self.evaluator:
+            return get_batch_evaluator(size).evaluate_children(board, symbol, moves)
+        if self._batch_evaluator is None:
+            weights = evaluator.weights
+            self._batch_evaluator = BatchEvaluator(size, weights, weights if evaluator.subtract_opponent else None)
+        return self._batch_evaluator.evaluate_children(board, symbol, moves)
+
+    def get_move(self, board, moves=None):
+        # moves: the valid moves for this player if the caller already generated them
+        if not self.stats:
+            return self.find_move(board, moves)
+        stats = SearchStats()
+        self.search.stats = stats
+        nodes = self.nodes_searched()
+        start = time.perf_counter()
+        try:
+            move = self.find_move(board, moves)
+        finally:
+            self.search.stats = None
+        stats.time = time.perf_counter() - start
+        stats.nodes = self.nodes_searched() - nodes
+        stats.searches = 1
+        stats.depth = self.last_depth
+        self.last_stats = stats
+        return move
 
-    def find_max_move(self, board, symbol):
-        val_moves = board.calc_valid_moves(symbol)
-        potential_scores = {}
-        for x in val_moves:
-            potential_scores[str(x)] = len(board.is_valid_move(symbol, x))
-        if len(val_moves) > 0:
-            best_choice = val_moves[0]
-            highest_val = potential_scores.get(str(best_choice))
-            for x in val_moves:
-                if potential_scores.get(str(x)) > highest_val:
-                    highest_val = potential_scores.get(str(x))
-                    best_choice = x
+    def find_move(self, board, moves=None):
+        self.last_depth = 0
+        if self.book is not None:
+            move = self.book.lookup(board, self.symbol)
+            if move is not None:
+                return move
+        if self.cache is None:
+            return self.search_move(board, moves)[0]
+        size = board.get_size()
+        # With symmetry, rotations and reflections of a position share one entry, stored in the canonical
+        # position's coordinates (symmetry is part of cache_config, so these keys never mix with plain ones)
+        if self.symmetry:
+            key, transform = board.get_canonical_hash(self.symbol)
+        else:
+            key, transform = board.get_hash(self.symbol), 0
+        found = self.cache.lookup(key, size, self.cache_config)
+        if found is not None:
+            move = untransform_move([found[0] // size, found[0] % size], transform, size)
+            # A hash collision could name an illegal move
+            if board.is_valid_move(self.symbol, move):
+                return move
+        move, score = self.search_move(board, moves)
+        if score is not None and score > -INFINITY:
+            stored = transform_move(move, transform, size)
+            self.cache.store(key, size, self.cache_config, stored[0] * size + stored[1], score)
+        return move
 
-            return potential_scores.get(str(best_choice))
-        return 0
+    def search_move(self, board, moves=None):
+        # [move, score] from the endgame solver or the search (score is None if a timed search found nothing)
+        time_limit_ms = self.time_limit_ms
+        empties = board.get_empty_count()
+        if empties <= self.endgame_threshold(board.get_size()):
+            if time_limit_ms is None:
+                self.last_depth = empties
+                return self.endgame.solve(board, self.symbol)
+            start = time.perf_counter()
+            try:
+                result = self.endgame.solve(board, self.symbol, time_limit_ms=time_limit_ms * ENDGAME_TIME_SHARE)
+                self.last_depth = empties
+                return result
+            except SearchTimeout:
+                time_limit_ms -= (time.perf_counter() - start) * 1000
+        if self.workers > 1:
+            if self.parallel is None:
+                self.parallel = RootParallelSearch(self, self.workers)
+            result = self.parallel.search(board, self.symbol, self.depth, time_limit_ms, moves, self.search.stats)
+            self.last_depth = self.parallel.completed_depth
+            return result
+        if moves is not None:
+            moves = self.search.ordered_moves(board, self.symbol, moves)
+        if time_limit_ms is not None:
+            result = self.search.iterative_deepening(board, self.symbol, time_limit_ms, self.depth, moves)
+            self.last_depth = self.search.completed_depth
+            return result
+        self.last_depth = self.depth
+        return self.search.search(board, self.symbol, self.depth, moves)
+
+    def endgame_threshold(self, size):
+        # Empty squares at which the endgame solver takes over on a size x size board
+        if self.endgame_empties is not None:
+            return self.endgame_empties
+        return min(ENDGAME_EMPTIES_8X8, ENDGAME_EMPTIES_8X8 * size * size // 64)
+
+    def config_string(self):
+        # The settings that decide which move the search picks, as the search cache keys them
+        config = {"class": type(self).__name__, "beam": self.beamSearch, "killer": self.killerMove,
+                  "transposition": self.transposition, "qui": self.qui, "depth": self.depth,
+                  "time_limit_ms": self.time_limit_ms, "endgame_empties": self.endgame_empties,
+                  "symmetry": self.symmetry, "batch_eval": self.batch_eval,
+                  "evaluator": None if self.evaluator is None else self.evaluator.to_dict()}
+        return json.dumps(config, sort_keys=True)
+
+    def nodes_searched(self):
+        # Nodes searched by this player so far, in this process and in its workers
+        nodes = self.search.nodes + self.endgame.nodes
+        if self.parallel is not None:
+            nodes += self.parallel.nodes
+        return nodes
+
+    def close(self):
+        # Shuts down the worker processes of workers > 1; a later get_move starts new ones
+        if self.parallel is not None:
+            self.parallel.close()
+            self.parallel = None
+
+    def __del__(self):
+        self.close()
+
+    def __getstate__(self):
+        # The worker pool stays in this process; a pickled copy starts its own if it needs one
+        state = self.__dict__.copy()
+        state['parallel'] = None
+        return state
+
+
+class MiniMaxPlayer2(MiniMaxPlayer):
+    # Minimax agent that searches as deep as it can within time_limit_ms per move
+    def __init__(self, symbol, beamSearch, killerMove, transposition, qui, time_limit_ms=1000):
+        super().__init__(symbol, beamSearch, killerMove, transposition, qui, depth=None,
+                         time_limit_ms=time_limit_ms)
@@ -0,0 +1,390 @@
+# Negamax search with alpha-beta pruning used by MiniMaxPlayer.
+# The four enhancements (beam search, killer moves, transposition table and quiescence)
+# are switched on and off with constructor arguments.
+import heapq
+import time
+from reversi.reversi_board import transform_move, untransform_move
+from reversi.player6.move_ordering import CORNER, MoveOrdering, ordering_classes
+from reversi.player6.transposition import TranspositionTable
+
+INFINITY = 10 ** 9
+
+# Transposition table bound types
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Quiescence: past the horizon, moves that take a corner, flip at least VOLATILE_FLIPS discs or leave the
+# opponent without a move are searched up to QUIESCENCE_DEPTH more plies (qui=True)
+VOLATILE_FLIPS = 4
+QUIESCENCE_DEPTH = 4
+
+# beam=True keeps this fraction of the moves; nodes with BEAM_MIN_MOVES moves or fewer are never cut
+DEFAULT_BEAM_WIDTH = 0.5
+BEAM_MIN_MOVES = 3
+
+# The clock is checked once every this many nodes (must be a power of two)
+TIME_CHECK_INTERVAL = 256
+
+
+class SearchTimeout(Exception):
+    # Raised inside the search when the time budget of iterative_deepening runs out
+    pass
+
+
+class SearchStats:
+    # What one or more searches did. AlphaBetaSearch fills one in when its stats attribute is set;
+    # add() sums them, e.g. over the moves of a game.
+    COUNTERS = ("searches", "nodes", "interior_nodes", "children", "leaf_evals", "tt_probes", "tt_hits",
+                "tt_cutoffs", "qui_nodes", "beam_prunes", "killer_moves")
+
+    def __init__(self):
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        self.depth = 0
+        self.time = 0.0
+        self.ordering_time = 0.0
+
+    def add(self, other):
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.depth = max(self.depth, other.depth)
+        self.time += other.time
+        self.ordering_time += other.ordering_time
+
+    def nodes_per_second(self):
+        return self.nodes / self.time if self.time else 0.0
+
+    def branching_factor(self):
+        # Average number of moves searched below an expanded node
+        return self.children / self.interior_nodes if self.interior_nodes else 0.0
+
+    def effective_branching_factor(self):
+        # b such that b ** depth == nodes per search
+        if not self.depth or not self.searches:
+            return 0.0
+        return (self.nodes / self.searches) ** (1 / self.depth)
+
+    def as_dict(self):
+        result = {name: getattr(self, name) for name in self.COUNTERS}
+        result.update(depth=self.depth, time=self.time, ordering_time=self.ordering_time,
+                      nodes_per_second=self.nodes_per_second(), branching_factor=self.branching_factor(),
+                      effective_branching_factor=self.effective_branching_factor())
+        return result
+
+    def __str__(self):
+        return "nodes %d (%.0f/s) depth %d ebf %.2f tt %d/%d qui %d beam %d killer %d" % (
+            self.nodes, self.nodes_per_second(), self.depth, self.effective_branching_factor(),
+            self.tt_hits, self.tt_probes, self.qui_nodes, self.beam_prunes, self.killer_moves)
+
+
+class AlphaBetaSearch:
+
+    def __init__(self, evaluate, beam=False, killer=False, transposition=False, qui=False, table=None,
+                 batch_evaluate=None, symmetry=False):
+        # evaluate(board, symbol) scores a position from symbol's point of view.
+        # beam keeps only the best-scoring moves at every node: a number of moves, a fraction of them
+        # (e.g. 0.25), or True for DEFAULT_BEAM_WIDTH.
+        # killer turns on the killer move slots and the history table of the move ordering (see
+        # move_ordering.py); the static corners-first ordering is always used.
+        # qui extends the search past the horizon along volatile moves only: True for QUIESCENCE_DEPTH plies,
+        # or the number of plies.
+        # table is the TranspositionTable to use when transposition is on (a default-sized one if None).
+        # batch_evaluate(board, symbol, moves), if given, scores all the leaf children of a depth-1 node
+        # in one call (as -evaluate(child, opponent) for each move). No leaf is pruned then, so this is
+        # slower unless a batch costs much less than the leaves alpha-beta would skip (see batch_eval.py).
+        # symmetry keys the transposition table by the canonical (rotation/reflection-free) position.
+        self.evaluate = evaluate
+        self.beam = DEFAULT_BEAM_WIDTH if beam is True else beam
+        self.killer = killer
+        self.ordering = MoveOrdering(killers=killer, history=killer)
+        self.transposition = transposition
+        self.qui = QUIESCENCE_DEPTH if qui is True else qui
+        self.batch_evaluate = batch_evaluate
+        self.symmetry = symmetry
+        if transposition and table is None:
+            table = TranspositionTable()
+        self.table = table
+        self.nodes = 0
+        self.deadline = None
+        # SearchStats to fill in during searches, or None to skip the bookkeeping
+        self.stats = None
+        # Principal variation of the last completed search, and the one being built
+        self.pv = []
+        self._pv_lines = []
+        self._previous_pv = []
+        self._following_pv = False
+        self.completed_depth = 0
+        # [move, score] of every iteration the last iterative_deepening finished, depth 1 first
+        self.depth_results = []
+
+    def iterative_deepening(self, board, symbol, time_limit_ms, max_depth=None, moves=None):
+        # Searches depth 1, 2, 3... until time_limit_ms runs out and returns [move, score] from the
+        # deepest iteration that finished. Each iteration tries the previous principal variation first.
+        # moves restricts the root to those moves (all valid moves if None).
+        empties = board.get_empty_count()
+        if max_depth is None or max_depth > empties:
+            max_depth = empties
+        work = board.copy()
+        best = [(moves or self.ordered_moves(work, symbol))[0], None]
+        self.pv = []
+        self.completed_depth = 0
+        self.depth_results = []
+        self.deadline = time.perf_counter() + time_limit_ms / 1000
+        try:
+            for depth in range(1, max(max_depth, 1) + 1):
+                best = self.search(work, symbol, depth, moves)
+                self.completed_depth = depth
+                self.depth_results.append(best)
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = None
+        return best
+
+    def search(self, board, symbol, depth, moves=None):
+        # Returns [move, score] for symbol after searching depth plies (only the given root moves if any).
+        # The board is searched in place and restored before returning.
+        opponent = board.get_opponent_symbol(symbol)
+        if self.symmetry and self.transposition:
+            board.enable_symmetry()
+        self._previous_pv = self.pv
+        self._following_pv = True
+        if self.killer:
+            self.ordering.age()
+        if moves is None:
+            moves = self.ordered_moves(board, symbol)
+        moves = self._pv_first(list(moves), 0)
+        best = [moves[0], -INFINITY]
+        alpha = -INFINITY
+        for move in moves:
+            score = self._child_value(board, symbol, opponent, move, depth - 1, -INFINITY, -alpha, 1)
+            if score > best[1]:
+                best = [move, score]
+                alpha = score
+                self._set_pv(0, move)
+            self._following_pv = False
+        self.pv = self._pv_lines[0]
+        return best
+
+    def _set_pv(self, ply, move):
+        # The line through move becomes this ply's principal variation
+        lines = self._pv_lines
+        while len(lines) <= ply + 1:
+            lines.append([])
+        lines[ply] = [move] + lines[ply + 1]
+
+    def _clear_pv(self, ply):
+        # Starts an empty principal variation for the node about to be searched at ply
+        lines = self._pv_lines
+        while len(lines) <= ply:
+            lines.append([])
+        lines[ply] = []
+
+    def _pv_first(self, moves, ply):
+        # Moves the previous iteration's principal variation move to the front while still on that line
+        if self._following_pv:
+            if ply < len(self._previous_pv) and self._previous_pv[ply] in moves:
+                pv_move = self._previous_pv[ply]
+                moves.remove(pv_move)
+                moves.insert(0, pv_move)
+            else:
+                self._following_pv = False
+        return moves
+
+    def _count_node(self):
+        self.nodes += 1
+        if self.deadline is not None and self.nodes & (TIME_CHECK_INTERVAL - 1) == 0:
+            if time.perf_counter() >= self.deadline:
+                raise SearchTimeout()
+
+    def _negamax(self, board, symbol, depth, alpha, beta, ply):
+        self._count_node()
+        stats = self.stats
+        if depth <= 0:
+            if self.qui:
+                return self._quiescence(board, symbol, alpha, beta, self.qui)
+            if stats is not None:
+                stats.leaf_evals += 1
+            return self.evaluate(board, symbol)
+        opponent = board.get_opponent_symbol(symbol)
+
+        alpha_start = alpha
+        table_move = None
+        if self.transposition:
+            if self.symmetry:
+                key, transform = board.get_canonical_hash(symbol)
+            else:
+                key, transform = board.get_hash(symbol), 0
+            entry = self.table.probe(key)
+            if stats is not None:
+                stats.tt_probes += 1
+            if entry is not None:
+                if stats is not None:
+                    stats.tt_hits += 1
+                entry_key, entry_depth, score, bound, table_move = entry
+                if transform:
+                    table_move = untransform_move(table_move, transform, board.get_size())
+                if entry_depth >= depth:
+                    if bound == LOWER and score > alpha:
+                        alpha = score
+                    elif bound == UPPER and score < beta:
+                        beta = score
+                    if bound == EXACT or alpha >= beta:
+                        if stats is not None:
+                            stats.tt_cutoffs += 1
+                        return score
+
+        # Children the beam already expanded: square -> undo record to replay instead of making the move again
+        children = {} if self.beam else None
+        moves = self.ordered_moves(board, symbol, ply=ply, children=children)
+        if not moves:
+            if not board.calc_valid_moves(opponent):
+                # Neither side can move: the game is over
+                if stats is not None:
+                    stats.leaf_evals += 1
+                return self.evaluate(board, symbol)
+            # Pass: the opponent moves again from the same position
+            self._following_pv = False
+            self._clear_pv(ply + 1)
+            return -self._negamax(board, opponent, depth - 1, -beta, -alpha, ply + 1)
+
+        if table_move is not None and table_move in moves:
+            # The best move found last time this position was searched goes first
+            moves.remove(table_move)
+            moves.insert(0, table_move)
+        moves = self._pv_first(moves, ply)
+        if stats is not None:
+            stats.interior_nodes += 1
+            stats.children += len(moves)
+        best = -INFINITY
+        best_move = moves[0]
+        if depth == 1 and self.batch_evaluate is not None and not self.qui:
+            # Every child is a leaf: score them together instead of one negamax call each
+            self.nodes += len(moves)
+            if stats is not None:
+                stats.leaf_evals += len(moves)
+            self._following_pv = False
+            for move, score in zip(moves, self.batch_evaluate(board, symbol, moves)):
+                if score > best:
+                    best = score
+                    best_move = move
+            if best > alpha:
+                self._pv_lines[ply] = [best_move]
+        else:
+            for move in moves:
+                score = self._child_value(board, symbol, opponent, move, depth - 1, -beta, -alpha, ply + 1,
+                                          children)
+                self._following_pv = False
+                if score > best:
+                    best = score
+                    best_move = move
+                    if score > alpha:
+                        alpha = score
+                        self._set_pv(ply, move)
+                        if alpha >= beta:
+                            if self.killer:
+                                self.ordering.record_cutoff(board.get_size(), symbol, move, ply, depth)
+                            break
+
+        if self.transposition:
+            if best <= alpha_start:
+                bound = UPPER
+            elif best >= beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            if transform:
+                best_move = transform_move(best_move, transform, board.get_size())
+            self.table.store(key, depth, best, bound, best_move)
+        return best
+
+    def _child_value(self, board, symbol, opponent, move, depth, alpha, beta, ply, children=None):
+        # Plays move, scores the child from symbol's point of view and takes the move back.
+        # children: undo records of moves the beam already made once, replayed with redo_move.
+        self._clear_pv(ply)
+        undo = self._play(board, symbol, move, children)
+        score = -self._negamax(board, opponent, depth, alpha, beta, ply)
+        board.unmake_move(undo)
+        return score
+
+    def _quiescence(self, board, symbol, alpha, beta, depth):
+        # Score of a horizon position: the static score (stand pat) unless a volatile move does better,
+        # searched depth more plies along volatile moves only. The caller has counted this node already.
+        stats = self.stats
+        if stats is not None:
+            stats.leaf_evals += 1
+        best = self.evaluate(board, symbol)
+        if depth <= 0 or best >= beta:
+            return best
+        if best > alpha:
+            alpha = best
+        opponent = board.get_opponent_symbol(symbol)
+        size = board.get_size()
+        classes = ordering_classes(size)
+        # Disc counts are kept by the board, so the flips of a move are a difference of two lookups
+        discs = board.calc_scores()[symbol]
+        for move in board.calc_valid_moves(symbol):
+            undo = board.make_move(symbol, move)
+            volatile = (classes[move[0] * size + move[1]] == CORNER
+                        or board.calc_scores()[symbol] - discs - 1 >= VOLATILE_FLIPS
+                        or board.count_valid_moves(opponent) == 0)
+            if volatile:
+                self._count_node()
+                if stats is not None:
+                    stats.qui_nodes += 1
+                score = -self._quiescence(board, opponent, -beta, -alpha, depth - 1)
+            board.unmake_move(undo)
+            if volatile and score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best
+
+    def _play(self, board, symbol, move, children):
+        if children:
+            undo = children.get(move[0] * board.get_size() + move[1])
+            if undo is not None:
+                return board.redo_move(undo)
+        return board.make_move(symbol, move)
+
+    def ordered_moves(self, board, symbol, moves=None, ply=0, children=None):
+        # Valid moves for symbol (moves if already generated), cut down by the beam and sorted by the move
+        # ordering for that ply. If children is a dict, the beam fills it with the undo record of every
+        # move it kept (by square) so the search can replay the move instead of making it again.
+        stats = self.stats
+        if stats is not None:
+            start = time.perf_counter()
+        if moves is None:
+            moves = board.calc_valid_moves(symbol)
+        if self.beam and len(moves) > BEAM_MIN_MOVES:
+            width = self.beam_width(len(moves))
+            if width < len(moves):
+                scored = []
+                for index, move in enumerate(moves):
+                    undo = board.make_move(symbol, move)
+                    scored.append((self.evaluate(board, symbol), -index, move, undo))
+                    board.unmake_move(undo)
+                kept = heapq.nlargest(width, scored, key=lambda item: item[:2])
+                if stats is not None:
+                    stats.beam_prunes += len(moves) - width
+                moves = [move for score, index, move, undo in kept]
+                if children is not None:
+                    for score, index, move, undo in kept:
+                        children[undo[1]] = undo
+        if len(moves) > 1:
+            moves = self.ordering.order(board.get_size(), symbol, moves, ply)
+        if stats is not None and self.killer:
+            killers = self.ordering.killers_at(ply)
+            stats.killer_moves += sum(1 for move in moves if move in killers)
+        if stats is not None:
+            stats.ordering_time += time.perf_counter() - start
+        return moves
+
+    def beam_width(self, count):
+        # How many of count moves the beam keeps
+        if isinstance(self.beam, float):
+            return max(1, int(count * self.beam))
+        return max(1, min(count, self.beam))
@@ -0,0 +1,128 @@
+# Persistent cache of search results, shared between runs and between processes.
+#
+# MiniMaxPlayer looks up the position it has to move in before searching and stores what it found after.
+# Results live in an SQLite database keyed by position hash (side to move mixed in), board size and the
+# player's configuration string, so players with different settings never share entries. The database is in
+# WAL mode: any number of processes can read while one writes. When it grows past max_entries the least
+# recently used entries are deleted.
+#
+# Each process opens its own connection on first use (SQLite connections must not cross fork()), and lookups
+# only read: the last-used times of hits are written in batches, so readers do not queue on the write lock.
+import os
+import sqlite3
+import time
+
+# Eviction is checked once every this many stores per process; it deletes down to EVICT_TO of max_entries
+EVICT_INTERVAL = 256
+EVICT_TO = 0.9
+# Hits remembered before their last-used times are written
+TOUCH_BATCH = 64
+
+# Connections inherited through fork(). They are kept alive but never used: closing one in the child would
+# also be use across fork().
+_inherited_connections = []
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    config TEXT NOT NULL,
+    square INTEGER NOT NULL,
+    score REAL NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (key, size, config)
+);
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+"""
+
+
+class SearchCache:
+
+    def __init__(self, path, max_entries=10 ** 6):
+        self.path = path
+        self.max_entries = max_entries
+        self._connection = None
+        self._pid = None
+        self._stores = 0
+        # (last used, key, size, config) for hits not written yet
+        self._touches = []
+
+    def _db(self):
+        # This process's connection, opened on first use and again in a forked child
+        if self._pid != os.getpid():
+            if self._connection is not None:
+                _inherited_connections.append(self._connection)
+            self._connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            # In WAL mode NORMAL only syncs at checkpoints: a crash can lose the last results but never corrupts
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(_SCHEMA)
+            self._pid = os.getpid()
+            self._stores = 0
+            self._touches = []
+        return self._connection
+
+    def lookup(self, key, size, config):
+        # Returns (move square, score) stored for the position, or None. A hit counts as a use for eviction.
+        key = _signed(key)
+        row = self._db().execute("SELECT square, score FROM results WHERE key = ? AND size = ? AND config = ?",
+                                 (key, size, config)).fetchone()
+        if row is None:
+            return None
+        self._touches.append((time.time(), key, size, config))
+        if len(self._touches) >= TOUCH_BATCH:
+            self.flush()
+        return row
+
+    def store(self, key, size, config, square, score):
+        self._db().execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                           (_signed(key), size, config, square, score, time.time()))
+        self._stores += 1
+        if self._stores % EVICT_INTERVAL == 0:
+            self.evict()
+
+    def flush(self):
+        # Writes the last-used times of the hits since the previous flush in one transaction
+        if not self._touches:
+            return
+        connection = self._db()
+        with connection:
+            connection.execute("BEGIN")
+            connection.executemany("UPDATE results SET used = max(used, ?) WHERE key = ? AND size = ? AND config = ?",
+                                   self._touches)
+        self._touches = []
+
+    def evict(self):
+        # Deletes the least recently used entries if there are more than max_entries
+        self.flush()
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            excess += int(self.max_entries * (1 - EVICT_TO))
+            self._db().execute("DELETE FROM results WHERE rowid IN "
+                               "(SELECT rowid FROM results ORDER BY used LIMIT ?)", (excess,))
+
+    def clear(self):
+        self._touches = []
+        self._db().execute("DELETE FROM results")
+
+    def close(self):
+        if self._pid == os.getpid():
+            self.flush()
+            self._connection.close()
+        self._connection = None
+        self._pid = None
+
+    def __len__(self):
+        return self._db().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def __getstate__(self):
+        # Pickled copies (players sent to spawned worker processes) connect on first use
+        return {"path": self.path, "max_entries": self.max_entries}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["max_entries"])
+
+
+def _signed(key):
+    # SQLite integers are signed 64-bit; Zobrist hashes are unsigned
+    return key - 2 ** 64 if key >= 2 ** 63 else key
@@ -0,0 +1,47 @@
+# Transposition table for AlphaBetaSearch.
+# Entries are keyed by the board's Zobrist hash (with the side to move mixed in) and hold the search
+# depth, score, bound type and best move. The table has a fixed number of buckets; each bucket keeps
+# one depth-preferred entry and one always-replace entry, so memory stays bounded however long it is used.
+
+# Rough memory cost of one stored entry (tuple, ints and move list) in bytes
+ENTRY_BYTES = 200
+
+
+class TranspositionTable:
+
+    def __init__(self, entries=2 ** 16, megabytes=None):
+        # Capacity is given either as a number of entries or as an approximate size in megabytes
+        if megabytes is not None:
+            entries = int(megabytes * 2 ** 20 / ENTRY_BYTES)
+        self.buckets = max(1, entries // 2)
+        self._deep = [None] * self.buckets
+        self._recent = [None] * self.buckets
+
+    def probe(self, key):
+        # Returns the entry (key, depth, score, bound, move) stored for key, or None
+        index = key % self.buckets
+        entry = self._deep[index]
+        if entry is not None and entry[0] == key:
+            return entry
+        entry = self._recent[index]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, score, bound, move):
+        index = key % self.buckets
+        entry = (key, depth, score, bound, move)
+        deep = self._deep[index]
+        if deep is None or deep[0] == key or depth >= deep[1]:
+            # The depth-preferred slot only gives way to an equal or deeper search
+            self._deep[index] = entry
+        else:
+            self._recent[index] = entry
+
+    def clear(self):
+        self._deep = [None] * self.buckets
+        self._recent = [None] * self.buckets
+
+    def __len__(self):
+        return sum(1 for entry in self._deep if entry is not None) + \
+            sum(1 for entry in self._recent if entry is not None)
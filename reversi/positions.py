@@ -0,0 +1,110 @@
+# Bulk position datasets: an append-only file of fixed-size binary position records.
+#
+# The file starts with a header (magic, version, board size, record size) followed by one
+# encode_position record per position (side to move plus two bitboards). Records have a fixed size,
+# so position i is at a known offset: iter_positions streams a file with a generator and
+# PositionDataset memory-maps it for random access.
+import mmap
+import os
+import struct
+
+from reversi.reversi_board import decode_position, encode_position, position_record_size
+
+MAGIC = b"RVPS"
+VERSION = 1
+# magic, version, board size, record size
+HEADER = struct.Struct("<4sHHI")
+
+# Records read per chunk by iter_positions
+READ_CHUNK_RECORDS = 4096
+
+
+class PositionWriter:
+    # Appends positions to a dataset file, creating it (with its header) if needed.
+    # Writes are buffered; use as a context manager or call close() to flush.
+
+    def __init__(self, path, size, buffer_records=4096):
+        self.size = size
+        self.record_size = position_record_size(size)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                file_size, record_size = _read_header(f, path)
+            if file_size != size:
+                raise ValueError("%s holds %dx%d positions, not %dx%d" % (path, file_size, file_size, size, size))
+            self._file = open(path, "ab", buffering=buffer_records * self.record_size)
+        else:
+            self._file = open(path, "wb", buffering=buffer_records * self.record_size)
+            self._file.write(HEADER.pack(MAGIC, VERSION, size, self.record_size))
+
+    def write(self, board, symbol=None):
+        if board.get_size() != self.size:
+            raise ValueError("expected a %dx%d board" % (self.size, self.size))
+        self._file.write(encode_position(board, symbol))
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def iter_positions(path, bitboard=True):
+    # Yields (board, symbol to move or None) for every record, reading the file in chunks
+    with open(path, "rb") as f:
+        size, record_size = _read_header(f, path)
+        while True:
+            chunk = f.read(record_size * READ_CHUNK_RECORDS)
+            if not chunk:
+                break
+            for offset in range(0, len(chunk) - record_size + 1, record_size):
+                yield decode_position(chunk[offset:offset + record_size], size, bitboard)
+
+
+class PositionDataset:
+    # Random access to a dataset file through mmap: dataset[i] decodes only record i.
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self.size, self.record_size = _read_header(self._file, path)
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count = (len(self._map) - HEADER.size) // self.record_size
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        # Returns (board, symbol to move or None)
+        return decode_position(self.record(index), self.size)
+
+    def record(self, index):
+        # The raw bytes of record index
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("position index out of range")
+        start = HEADER.size + index * self.record_size
+        return self._map[start:start + self.record_size]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _read_header(f, path):
+    magic, version, size, record_size = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("%s is not a version %d position dataset" % (path, VERSION))
+    return size, record_size
@@ -1,37 +1,305 @@
 # adapted by Toby Dragon from original source code by Al Sweigart, available with creative commons license: https://inventwithpython.com/#donate
 import json
+import random
+from functools import lru_cache
 
 
 class ReversiBoard:
 
-    def __init__(self, size=8, board_filename=None):
+    def __init__(self, size=8, board_filename=None, bitboard=True):
         if board_filename is None:
-            self._board = _getNewBoard(size)
+            board = _getNewBoard(size)
         else:
-            self._board = _board_from_json(board_filename)
+            board = _board_from_json(board_filename)
+        self._load(board, bitboard)
+
+    def _load(self, board, bitboard):
+        # bitboard=True keeps the position as two integers (one bit per square) and generates moves
+        # with shifts and masks; bitboard=False keeps the original list of lists of ' '/'X'/'O'.
+        self._bitboard = bitboard
+        # Zobrist hash of the disc layout, kept up to date by make_move and unmake_move
+        self._zobrist = _getZobristKeys(len(board))
+        self._hash = _hashBoard(board, self._zobrist)
+        # Hashes of the 8 rotated/reflected positions, only kept once enable_symmetry is called
+        self._symmetry_hashes = None
+        # Disc counts, and per-symbol sums of an optional square-weight table (see set_weights),
+        # are also updated on every move instead of being recounted
+        self._size = len(board)
+        self._counts = _getScoreOfBoard(board)
+        self._weights = None
+        self._weight_sums = None
+        if bitboard:
+            self._tables = _getBitTables(self._size)
+            self._discs = _bitsFromBoard(board)
+            self._board = None
+        else:
+            self._board = board
+            self._neighbors = _getRayTables(self._size).neighbors
+            self._frontier = _getFrontier(board)
 
     def draw_board(self):
-        _drawBoard(self._board)
+        _drawBoard(self._to_list())
 
     def is_valid_move(self, symbol, position):
+        if self._bitboard:
+            x, y = position[0], position[1]
+            if not _isOnBoard(x, y, self._size):
+                return False
+            flips = self._flips(symbol, x * self._size + y)
+            if not flips:
+                return False
+            return [[sq // self._size, sq % self._size] for sq in _bitSquares(flips)]
         return _isValidMove(self._board, symbol, position[0], position[1])
 
     def calc_scores(self):
-        return _getScoreOfBoard(self._board)
+        return {'X': self._counts['X'], 'O': self._counts['O']}
+
+    def get_empty_count(self):
+        return self._size * self._size - self._counts['X'] - self._counts['O']
+
+    def set_weights(self, weights):
+        # weights: one number per square, flat (index x * size + y) or as size lists of size.
+        # Afterwards get_weight_sum(symbol) is the total weight of symbol's squares, kept up to date by moves.
+        if len(weights) == self._size and len(weights) != self._size * self._size:
+            weights = [weight for column in weights for weight in column]
+        self._weights = weights
+        self._weight_sums = {'X': 0, 'O': 0}
+        board = self._to_list()
+        for x in range(self._size):
+            for y in range(self._size):
+                if board[x][y] in self._weight_sums:
+                    self._weight_sums[board[x][y]] += weights[x * self._size + y]
+
+    def get_weights(self):
+        return self._weights
+
+    def get_weight_sum(self, symbol):
+        return self._weight_sums[symbol]
 
     def make_move(self, symbol, position):
-        return _makeMove(self._board, symbol, position[0], position[1])
+        # Returns False if the move is invalid, otherwise an undo record (symbol, square, flipped)
+        # that unmake_move takes to restore the position in place.
+        if self._bitboard:
+            x, y = position[0], position[1]
+            if not _isOnBoard(x, y, self._size):
+                return False
+            square = x * self._size + y
+            flips = self._flips(symbol, square)
+            if not flips:
+                return False
+            return self._apply_bits(symbol, square, flips)
+        tilesToFlip = _makeMove(self._board, symbol, position[0], position[1])
+        if tilesToFlip == False:
+            return False
+        return self._apply_tiles(symbol, position[0] * self._size + position[1], tilesToFlip)
+
+    def redo_move(self, undo):
+        # Plays a move again from the undo record make_move returned for it, after unmake_move took it back.
+        # The flipped discs are already known, so this skips the flip search of make_move.
+        symbol, square, flips = undo
+        if self._bitboard:
+            return self._apply_bits(symbol, square, flips)
+        board = self._board
+        size = self._size
+        board[square // size][square % size] = symbol
+        for x, y in flips:
+            board[x][y] = symbol
+        return self._apply_tiles(symbol, square, flips)
+
+    def _apply_bits(self, symbol, square, flips):
+        # Bitboard only: places symbol on square, flips the discs in the flips mask and updates the bookkeeping
+        discs = self._discs
+        opponent = 'O' if symbol == 'X' else 'X'
+        discs[symbol] |= flips | (1 << square)
+        discs[opponent] &= ~flips
+        self._hash ^= self._zobrist.disc[symbol][square] ^ self._zobrist.flips_hash(flips)
+        count = flips.bit_count()
+        self._counts[symbol] += count + 1
+        self._counts[opponent] -= count
+        if self._weights is not None:
+            self._move_weights(symbol, opponent, square, _bitSquares(flips), 1)
+        if self._symmetry_hashes is not None:
+            self._move_symmetry_hashes(symbol, square, _bitSquares(flips))
+        return symbol, square, flips
+
+    def _apply_tiles(self, symbol, square, tilesToFlip):
+        # List engine only: updates the bookkeeping for a move already made on the board
+        size = self._size
+        opponent = 'O' if symbol == 'X' else 'X'
+        self._hash ^= self._zobrist.disc[symbol][square] ^ self._zobrist.tiles_hash(tilesToFlip, size)
+        self._counts[symbol] += len(tilesToFlip) + 1
+        self._counts[opponent] -= len(tilesToFlip)
+        # The square is no longer empty and its empty neighbors now touch a disc
+        self._frontier.discard(square)
+        for neighbor in self._neighbors[square]:
+            if self._board[neighbor // size][neighbor % size] == ' ':
+                self._frontier.add(neighbor)
+        if self._weights is not None:
+            self._move_weights(symbol, opponent, square, [x * size + y for x, y in tilesToFlip], 1)
+        if self._symmetry_hashes is not None:
+            self._move_symmetry_hashes(symbol, square, [x * size + y for x, y in tilesToFlip])
+        return symbol, square, tilesToFlip
+
+    def unmake_move(self, undo):
+        # Takes back a move using the record returned by make_move (False, from an invalid move, is a no-op).
+        if undo == False:
+            return
+        symbol, square, flips = undo
+        opponent = 'O' if symbol == 'X' else 'X'
+        if self._bitboard:
+            discs = self._discs
+            discs[symbol] &= ~(flips | (1 << square))
+            discs[opponent] |= flips
+            self._hash ^= self._zobrist.disc[symbol][square] ^ self._zobrist.flips_hash(flips)
+            count = flips.bit_count()
+            if self._weights is not None:
+                self._move_weights(symbol, opponent, square, _bitSquares(flips), -1)
+            if self._symmetry_hashes is not None:
+                self._move_symmetry_hashes(symbol, square, _bitSquares(flips))
+        else:
+            size = self._size
+            self._board[square // size][square % size] = ' '
+            for x, y in flips:
+                self._board[x][y] = opponent
+            self._unmake_frontier(square)
+            self._hash ^= self._zobrist.disc[symbol][square] ^ self._zobrist.tiles_hash(flips, size)
+            count = len(flips)
+            if self._weights is not None:
+                self._move_weights(symbol, opponent, square, [x * size + y for x, y in flips], -1)
+            if self._symmetry_hashes is not None:
+                self._move_symmetry_hashes(symbol, square, [x * size + y for x, y in flips])
+        self._counts[symbol] -= count + 1
+        self._counts[opponent] += count
+
+    def _unmake_frontier(self, square):
+        # List engine only: square is empty again, so it and its empty neighbors may touch no disc now
+        board = self._board
+        size = self._size
+        for empty in [square] + self._neighbors[square]:
+            if board[empty // size][empty % size] != ' ':
+                continue
+            for neighbor in self._neighbors[empty]:
+                if board[neighbor // size][neighbor % size] != ' ':
+                    self._frontier.add(empty)
+                    break
+            else:
+                self._frontier.discard(empty)
+
+    def _move_weights(self, symbol, opponent, square, flipped, sign):
+        # Moves the weights of the placed and flipped squares into (sign 1) or out of (sign -1) symbol's sum
+        weights = self._weights
+        flipped_weight = 0
+        for flipped_square in flipped:
+            flipped_weight += weights[flipped_square]
+        self._weight_sums[symbol] += sign * (weights[square] + flipped_weight)
+        self._weight_sums[opponent] -= sign * flipped_weight
+
+    def get_hash(self, symbol=None):
+        # 64-bit Zobrist hash of the position; pass the symbol to move to tell the two sides apart.
+        if symbol == 'O':
+            return self._hash ^ _ZOBRIST_O_TO_MOVE
+        return self._hash
+
+    def enable_symmetry(self):
+        # From now on make_move and unmake_move also keep the hashes of the 8 symmetric positions,
+        # which makes get_canonical_hash O(1). Costs a few XORs per flipped disc and transform.
+        if self._symmetry_hashes is None:
+            self._symmetry_hashes = _symmetryHashes(self.get_bitboards(), self._size)
+
+    def get_canonical_hash(self, symbol=None):
+        # Returns (hash, transform): the smallest hash over the 8 rotations and reflections of the position,
+        # and the transform that maps this position onto that canonical one. Positions that are rotations or
+        # reflections of each other share the canonical hash. Moves convert with transform_move and
+        # untransform_move. Without enable_symmetry the hashes are computed from scratch.
+        hashes = self._symmetry_hashes
+        if hashes is None:
+            hashes = _symmetryHashes(self.get_bitboards(), self._size)
+        transform = min(range(8), key=hashes.__getitem__)
+        if symbol == 'O':
+            return hashes[transform] ^ _ZOBRIST_O_TO_MOVE, transform
+        return hashes[transform], transform
+
+    def get_canonical(self):
+        # Returns (X bitboard, O bitboard, transform) of the canonical position (see get_canonical_hash)
+        hash_value, transform = self.get_canonical_hash()
+        x_bits, o_bits = self.get_bitboards()
+        permutation = _getSymmetryTables(self._size).permutations[transform]
+        return _permuteBits(x_bits, permutation), _permuteBits(o_bits, permutation), transform
+
+    def _move_symmetry_hashes(self, symbol, square, flipped):
+        tables = _getSymmetryTables(self._size)
+        flipped = list(flipped)
+        hashes = self._symmetry_hashes
+        for transform in range(8):
+            disc = tables.disc[transform][symbol]
+            flip = tables.flip[transform]
+            value = hashes[transform] ^ disc[square]
+            for flipped_square in flipped:
+                value ^= flip[flipped_square]
+            hashes[transform] = value
+
+    def position_key(self):
+        # Hashable key identifying the disc layout (side to move is not part of the board).
+        if self._bitboard:
+            return self._discs['X'], self._discs['O']
+        return tuple(''.join(column) for column in self._board)
+
+    def get_bitboards(self):
+        # (X discs, O discs) as integers with bit x * size + y set for an occupied square.
+        if self._bitboard:
+            return self._discs['X'], self._discs['O']
+        discs = _bitsFromBoard(self._board)
+        return discs['X'], discs['O']
+
+    def copy(self):
+        # Cheap independent copy of the position (much faster than copy.deepcopy).
+        new_board = ReversiBoard.__new__(ReversiBoard)
+        new_board._bitboard = self._bitboard
+        new_board._zobrist = self._zobrist
+        new_board._hash = self._hash
+        new_board._symmetry_hashes = None if self._symmetry_hashes is None else self._symmetry_hashes[:]
+        new_board._size = self._size
+        new_board._counts = dict(self._counts)
+        new_board._weights = self._weights
+        new_board._weight_sums = None if self._weight_sums is None else dict(self._weight_sums)
+        if self._bitboard:
+            new_board._tables = self._tables
+            new_board._discs = dict(self._discs)
+            new_board._board = None
+        else:
+            new_board._board = [column[:] for column in self._board]
+            new_board._neighbors = self._neighbors
+            new_board._frontier = set(self._frontier)
+        return new_board
 
     def calc_valid_moves(self, symbol):
-        return _checkValidMoves(self._board, symbol)
+        if self._bitboard:
+            size = self._size
+            return [[sq // size, sq % size] for sq in _bitSquares(self._valid_move_mask(symbol))]
+        return _checkValidMoves(self._board, symbol, self._frontier)
+
+    def count_valid_moves(self, symbol):
+        # len(calc_valid_moves(symbol)) without building the move list on the bitboard engine
+        if self._bitboard:
+            return self._valid_move_mask(symbol).bit_count()
+        return len(_checkValidMoves(self._board, symbol, self._frontier))
 
     def game_continues(self):
+        if self._bitboard:
+            return self._valid_move_mask("X") != 0 or self._valid_move_mask("O") != 0
         return self.calc_valid_moves("X") != [] or self.calc_valid_moves("O") != []
 
     def get_size(self):
-        return len(self._board)
+        return self._size
 
     def get_symbol_for_position(self, position):
+        if self._bitboard:
+            bit = 1 << (position[0] * self._size + position[1])
+            if self._discs['X'] & bit:
+                return 'X'
+            if self._discs['O'] & bit:
+                return 'O'
+            return ' '
         return self._board[position[0]][position[1]]
 
     def get_opponent_symbol(self, symbol):
@@ -42,7 +310,35 @@ class ReversiBoard:
 
     def to_json_file(self, filename):
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self._board, f, ensure_ascii=False)
+            json.dump(self._to_list(), f, ensure_ascii=False)
+
+    def to_bytes(self, symbol=None):
+        # Compact binary form: one size byte followed by encode_position (side to move optional)
+        return bytes([self._size]) + encode_position(self, symbol)
+
+    @classmethod
+    def from_bytes(cls, data, bitboard=True):
+        # Inverse of to_bytes; returns (board, symbol to move or None)
+        return decode_position(data[1:], data[0], bitboard)
+
+    def _to_list(self):
+        if self._bitboard:
+            return _boardFromBits(self._discs, self._size)
+        return self._board
+
+    def _valid_move_mask(self, symbol):
+        # Bitboard only: one bit set for every square where symbol has a legal move.
+        opponent = 'O' if symbol == 'X' else 'X'
+        return _bitValidMoves(self._discs[symbol], self._discs[opponent], self._tables)
+
+    def _flips(self, symbol, square):
+        # Bitboard only: mask of discs flipped by symbol playing on square (0 if the move is illegal).
+        opponent = 'O' if symbol == 'X' else 'X'
+        own = self._discs[symbol]
+        opp = self._discs[opponent]
+        if (own | opp) >> square & 1:
+            return 0
+        return _bitFlips(own, opp, square, self._tables)
 
 
 def _getNewBoard(size):
@@ -84,51 +380,37 @@ def _isValidMove(board, tile, xstart, ystart):
     # tile = player symbol
     # Returns False if the player's move on space xstart, ystart is invalid.
     # If it is a valid move, returns a list of spaces that would become the player's if they made a move here.
-    if board[xstart][ystart] != ' ' or not _isOnBoard(xstart, ystart, len(board)):
+    size = len(board)
+    if not _isOnBoard(xstart, ystart, size) or board[xstart][ystart] != ' ':
         return False
 
-    board[xstart][ystart] = tile  # temporarily set the tile on the board.
-
     if tile == 'X':
         otherTile = 'O'
     else:
         otherTile = 'X'
 
     tilesToFlip = []
-    for xdirection, ydirection in [[0, 1], [1, 1], [1, 0], [1, -1], [0, -1], [-1, -1], [-1, 0], [-1, 1]]:
-        x, y = xstart, ystart
-        x += xdirection  # first step in the direction
-        y += ydirection  # first step in the direction
-        if _isOnBoard(x, y, len(board)) and board[x][y] == otherTile:
-            # There is a piece belonging to the other player next to our piece.
-            x += xdirection
-            y += ydirection
-            if not _isOnBoard(x, y, len(board)):
-                continue
-            while board[x][y] == otherTile:
-                x += xdirection
-                y += ydirection
-                if not _isOnBoard(x, y, len(board)):  # break out of while loop, then continue in for loop
-                    break
-            if not _isOnBoard(x, y, len(board)):
-                continue
+    for ray in _getRayTables(size).rays[xstart * size + ystart]:
+        x, y = ray[0]
+        if board[x][y] != otherTile:
+            continue
+        # There is a piece belonging to the other player next to our piece: walk on until the run ends.
+        for i in range(1, len(ray)):
+            x, y = ray[i]
             if board[x][y] == tile:
-                # There are pieces to flip over. Go in the reverse direction until we reach the original space, noting all the tiles along the way.
-                while True:
-                    x -= xdirection
-                    y -= ydirection
-                    if x == xstart and y == ystart:
-                        break
-                    tilesToFlip.append([x, y])
+                tilesToFlip.extend([x, y] for x, y in ray[:i])
+                break
+            if board[x][y] != otherTile:
+                break
 
-    board[xstart][ystart] = ' '  # restore the empty space
     if len(tilesToFlip) == 0:  # If no tiles were flipped, this is not a valid move.
         return False
     return tilesToFlip
 
+
 def _makeMove(board, tile, xstart, ystart):
     # Place the tile on the board at xstart, ystart, and flip any of the opponent's pieces.
-    # Returns False if this is an invalid move, True if it is valid.
+    # Returns False if this is an invalid move, otherwise the list of flipped tiles.
     tilesToFlip = _isValidMove(board, tile, xstart, ystart)
 
     if tilesToFlip == False:
@@ -137,19 +419,71 @@ def _makeMove(board, tile, xstart, ystart):
     board[xstart][ystart] = tile
     for x, y in tilesToFlip:
         board[x][y] = tile
-    return True
+    return tilesToFlip
 
 
-def _checkValidMoves(board, tile):
+def _checkValidMoves(board, tile, candidates=None):
     # Returns a list of [x,y] lists of valid moves for the given player on the given board.
+    # candidates, if given, is the set of square indices (x * size + y) worth probing, e.g. the frontier.
+    size = len(board)
+    if candidates is None:
+        candidates = range(size * size)
+    else:
+        candidates = sorted(candidates)
     validMoves = []
-    for x in range(len(board)):
-        for y in range(len(board)):
-            if _isValidMove(board, tile, x, y) != False:
-                validMoves.append([x, y])
+    for square in candidates:
+        x, y = square // size, square % size
+        if _isValidMove(board, tile, x, y) != False:
+            validMoves.append([x, y])
     return validMoves
 
 
+def _getFrontier(board):
+    # Set of empty squares next to at least one disc: the only squares where a move can be legal.
+    size = len(board)
+    neighbors = _getRayTables(size).neighbors
+    frontier = set()
+    for x in range(size):
+        for y in range(size):
+            if board[x][y] == ' ':
+                for n in neighbors[x * size + y]:
+                    if board[n // size][n % size] != ' ':
+                        frontier.add(x * size + y)
+                        break
+    return frontier
+
+
+class _RayTables:
+    # Per-size tables for the list engine, built once and shared by every board of that size.
+    def __init__(self, size):
+        # rays[square]: for each direction with at least two squares before the edge, the [x, y]
+        # squares walking away from square. neighbors[square]: indices of the adjacent squares.
+        self.rays = []
+        self.neighbors = []
+        for x in range(size):
+            for y in range(size):
+                rays = []
+                neighbors = []
+                for xdirection, ydirection in _DIRECTIONS:
+                    ray = []
+                    cx, cy = x + xdirection, y + ydirection
+                    while _isOnBoard(cx, cy, size):
+                        ray.append((cx, cy))
+                        cx += xdirection
+                        cy += ydirection
+                    if len(ray) >= 2:
+                        rays.append(ray)
+                    if ray:
+                        neighbors.append(ray[0][0] * size + ray[0][1])
+                self.rays.append(rays)
+                self.neighbors.append(neighbors)
+
+
+@lru_cache(maxsize=None)
+def _getRayTables(size):
+    return _RayTables(size)
+
+
 def _getScoreOfBoard(board):
     # Determine the score by counting the tiles. Returns a dictionary with keys 'X' and 'O'.
     xscore = 0
@@ -163,6 +497,267 @@ def _getScoreOfBoard(board):
     return {'X': xscore, 'O': oscore}
 
 
+def position_record_size(size):
+    # Bytes taken by encode_position for a size x size board
+    return 1 + 2 * ((size * size + 7) // 8)
+
+
+def encode_position(board, symbol=None):
+    # Side-to-move byte (0 unknown, 1 X, 2 O) followed by the X and O bitboards, little-endian,
+    # (size * size + 7) // 8 bytes each: 17 bytes for 8x8 instead of hundreds of bytes of JSON.
+    width = (board.get_size() ** 2 + 7) // 8
+    x_bits, o_bits = board.get_bitboards()
+    return bytes([_SIDE_CODES[symbol]]) + x_bits.to_bytes(width, 'little') + o_bits.to_bytes(width, 'little')
+
+
+def decode_position(data, size, bitboard=True):
+    # Inverse of encode_position; returns (board, symbol to move or None)
+    width = (size * size + 7) // 8
+    discs = {'X': int.from_bytes(data[1:1 + width], 'little'),
+             'O': int.from_bytes(data[1 + width:1 + 2 * width], 'little')}
+    board = ReversiBoard.__new__(ReversiBoard)
+    board._load(_boardFromBits(discs, size), bitboard)
+    return board, _SIDE_SYMBOLS[data[0]]
+
+
+_SIDE_CODES = {None: 0, 'X': 1, 'O': 2}
+_SIDE_SYMBOLS = [None, 'X', 'O']
+
+
 def _board_from_json(board_filename):
     with open(board_filename) as json_file:
         return json.load(json_file)
+
+
+# Bitboard engine. Square (x, y) is bit x * size + y, so a size x size board needs size * size bits
+# and Python integers handle every size the constructor accepts (10x10 is 100 bits).
+
+_DIRECTIONS = [[0, 1], [1, 1], [1, 0], [1, -1], [0, -1], [-1, -1], [-1, 0], [-1, 1]]
+
+
+class _BitTables:
+    # Masks for one board size, built once and shared by every board of that size.
+    def __init__(self, size):
+        self.size = size
+        self.full = (1 << (size * size)) - 1
+        # (step, mask) pairs: a disc in mask can move one square in the direction by shifting
+        # left (step > 0) or right (step < 0) by abs(step) without leaving the board.
+        self.left_shifts = []
+        self.right_shifts = []
+        for xdirection, ydirection in _DIRECTIONS:
+            mask = 0
+            for x in range(size):
+                for y in range(size):
+                    if _isOnBoard(x + xdirection, y + ydirection, size):
+                        mask |= 1 << (x * size + y)
+            step = xdirection * size + ydirection
+            if step > 0:
+                self.left_shifts.append((step, mask))
+            else:
+                self.right_shifts.append((-step, mask))
+
+
+@lru_cache(maxsize=None)
+def _getBitTables(size):
+    return _BitTables(size)
+
+
+def _bitSquares(bits):
+    # Yields the index of every set bit, lowest first (same order as _checkValidMoves).
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def _bitValidMoves(own, opp, tables):
+    # Walks every direction at once for all of own's discs: a run of opponent discs that ends on an
+    # empty square makes that square a legal move.
+    empty = tables.full & ~(own | opp)
+    moves = 0
+    for step, mask in tables.left_shifts:
+        run = ((own & mask) << step) & opp
+        while run:
+            run = (run & mask) << step
+            moves |= run & empty
+            run &= opp
+    for step, mask in tables.right_shifts:
+        run = ((own & mask) >> step) & opp
+        while run:
+            run = (run & mask) >> step
+            moves |= run & empty
+            run &= opp
+    return moves
+
+
+def _bitFlips(own, opp, square, tables):
+    # Returns the mask of opponent discs flipped by own playing on the (empty) square.
+    move = 1 << square
+    flips = 0
+    for step, mask in tables.left_shifts:
+        run = 0
+        ray = (move & mask) << step
+        while ray & opp:
+            run |= ray
+            ray = (ray & mask) << step
+        if ray & own:
+            flips |= run
+    for step, mask in tables.right_shifts:
+        run = 0
+        ray = (move & mask) >> step
+        while ray & opp:
+            run |= ray
+            ray = (ray & mask) >> step
+        if ray & own:
+            flips |= run
+    return flips
+
+
+def _bitsFromBoard(board):
+    size = len(board)
+    discs = {'X': 0, 'O': 0}
+    for x in range(size):
+        for y in range(size):
+            if board[x][y] in discs:
+                discs[board[x][y]] |= 1 << (x * size + y)
+    return discs
+
+
+def _boardFromBits(discs, size):
+    board = _getNewBoard(size)
+    for x in range(size):
+        for y in range(size):
+            bit = 1 << (x * size + y)
+            if discs['X'] & bit:
+                board[x][y] = 'X'
+            elif discs['O'] & bit:
+                board[x][y] = 'O'
+            else:
+                board[x][y] = ' '
+    return board
+
+
+# Zobrist hashing: every (symbol, square) pair gets a fixed random 64-bit key and a position hashes to the
+# XOR of the keys of its discs. The keys come from a seeded generator so hashes agree between processes.
+
+_ZOBRIST_SEED = 20240601
+_ZOBRIST_O_TO_MOVE = random.Random(_ZOBRIST_SEED).getrandbits(64)
+
+
+class _ZobristKeys:
+    def __init__(self, size):
+        generator = random.Random(_ZOBRIST_SEED + size)
+        self.disc = {'X': [generator.getrandbits(64) for i in range(size * size)],
+                     'O': [generator.getrandbits(64) for i in range(size * size)]}
+        # Flipping a disc swaps its X key for its O key
+        self.flip = [x_key ^ o_key for x_key, o_key in zip(self.disc['X'], self.disc['O'])]
+
+    def flips_hash(self, flips):
+        flip = self.flip
+        result = 0
+        for square in _bitSquares(flips):
+            result ^= flip[square]
+        return result
+
+    def tiles_hash(self, tiles, size):
+        flip = self.flip
+        result = 0
+        for x, y in tiles:
+            result ^= flip[x * size + y]
+        return result
+
+
+@lru_cache(maxsize=None)
+def _getZobristKeys(size):
+    return _ZobristKeys(size)
+
+
+def _hashBoard(board, keys):
+    size = len(board)
+    result = 0
+    for x in range(size):
+        for y in range(size):
+            if board[x][y] in keys.disc:
+                result ^= keys.disc[board[x][y]][x * size + y]
+    return result
+
+
+# Symmetry. Transform t maps square (x, y) to _SYMMETRIES[t](x, y, size); the 8 transforms are the
+# rotations and reflections of the square board. Hashing a position under transform t means hashing
+# the transformed position, so the smallest of the 8 hashes is the same for every symmetric position.
+
+_SYMMETRIES = [
+    lambda x, y, n: (x, y),                  # identity
+    lambda x, y, n: (y, n - 1 - x),          # rotate 90
+    lambda x, y, n: (n - 1 - x, n - 1 - y),  # rotate 180
+    lambda x, y, n: (n - 1 - y, x),          # rotate 270
+    lambda x, y, n: (n - 1 - x, y),          # mirror rows
+    lambda x, y, n: (x, n - 1 - y),          # mirror columns
+    lambda x, y, n: (y, x),                  # transpose
+    lambda x, y, n: (n - 1 - y, n - 1 - x),  # anti-transpose
+]
+
+
+class _SymmetryTables:
+    def __init__(self, size):
+        keys = _getZobristKeys(size)
+        # permutations[t][square] is the square that square moves to under t; inverses undo that
+        self.permutations = []
+        self.inverses = []
+        # disc[t][symbol][square] and flip[t][square]: Zobrist keys of the transformed square
+        self.disc = []
+        self.flip = []
+        for symmetry in _SYMMETRIES:
+            permutation = []
+            for x in range(size):
+                for y in range(size):
+                    tx, ty = symmetry(x, y, size)
+                    permutation.append(tx * size + ty)
+            inverse = [0] * (size * size)
+            for square, target in enumerate(permutation):
+                inverse[target] = square
+            self.permutations.append(permutation)
+            self.inverses.append(inverse)
+            self.disc.append({symbol: [keys.disc[symbol][target] for target in permutation] for symbol in keys.disc})
+            self.flip.append([keys.flip[target] for target in permutation])
+
+
+@lru_cache(maxsize=None)
+def _getSymmetryTables(size):
+    return _SymmetryTables(size)
+
+
+def _symmetryHashes(bitboards, size):
+    tables = _getSymmetryTables(size)
+    x_squares = list(_bitSquares(bitboards[0]))
+    o_squares = list(_bitSquares(bitboards[1]))
+    hashes = []
+    for transform in range(8):
+        x_keys = tables.disc[transform]['X']
+        o_keys = tables.disc[transform]['O']
+        value = 0
+        for square in x_squares:
+            value ^= x_keys[square]
+        for square in o_squares:
+            value ^= o_keys[square]
+        hashes.append(value)
+    return hashes
+
+
+def _permuteBits(bits, permutation):
+    result = 0
+    for square in _bitSquares(bits):
+        result |= 1 << permutation[square]
+    return result
+
+
+def transform_move(move, transform, size):
+    # Maps a move [x, y] on a position to the same move on the position transformed by transform
+    square = _getSymmetryTables(size).permutations[transform][move[0] * size + move[1]]
+    return [square // size, square % size]
+
+
+def untransform_move(move, transform, size):
+    # Inverse of transform_move: maps a move on the transformed position back to the original one
+    square = _getSymmetryTables(size).inverses[transform][move[0] * size + move[1]]
+    return [square // size, square % size]
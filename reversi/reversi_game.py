@@ -1,65 +1,115 @@
 # Written by Toby Dragon
 
-import copy
-from datetime import datetime
+import inspect
+import pickle
+import random
+from concurrent.futures import ProcessPoolExecutor
+import time
+from reversi.game_record import GameLogWriter, GameRecord, describe_player
+from reversi.latency import game_phase, latency_histograms, print_latency_summary
 from reversi.reversi_board import ReversiBoard
+from reversi.player6.search import SearchStats
 from reversi.player6.reversi_players import HumanPlayer, RandomComputerPlayer, GreedyPlayer, MiniMaxPlayer
 import reversi.player6.all_players as players
 
 class ReversiGame:
 
-    def __init__(self, player1, player2, show_status=True, board_size=8, board_filename=None):
+    def __init__(self, player1, player2, show_status=True, board_size=8, board_filename=None, autoplay=True,
+                 copy_board=True):
+        # With autoplay=False the game is played step by step with play_one_move (or all at once with
+        # play_game). copy_board=False hands players the game's own board instead of a copy, which is safe
+        # for players that restore the board after searching it (all the computer players do).
         self.player1 = player1
         self.player2 = player2
         self.show_status = show_status
+        self.copy_board = copy_board
         if board_filename is None:
             self.board = ReversiBoard(board_size)
         else:
             self.board = ReversiBoard(board_filename=board_filename)
         self.decision_times = {self.player1.symbol: 0, self.player2.symbol: 0}
-        self.play_game()
+        # One (symbol, ply, empty squares before the move, get_move nanoseconds) record per move made,
+        # and the nanoseconds per symbol spent in the game loop around get_move
+        self.move_latencies = []
+        self.harness_times = {self.player1.symbol: 0, self.player2.symbol: 0}
+        self.ply = 0
+        # (symbol, [x, y]) and get_move nanoseconds per move made, for get_record
+        self.moves = []
+        self.move_times_ns = []
+        self.start = None if board_filename is None else self.board.to_bytes()
+        # Search statistics summed over the game, for players that record them (MiniMaxPlayer with stats=True)
+        self.search_stats = {self.player1.symbol: SearchStats(), self.player2.symbol: SearchStats()}
+        # player1 moves first; after that the players alternate, skipping a player who has no valid move
+        self.next_player = self.player1
+        self.finished = False
+        # Players whose get_move takes the valid moves as a second argument; others get the board only
+        self.takes_moves = {self.player1.symbol: accepts_moves(self.player1),
+                            self.player2.symbol: accepts_moves(self.player2)}
+        if autoplay:
+            self.play_game()
 
     def play_game(self):
-        switch = 0
         if self.show_status:
             self.board.draw_board()
-        while self.board.game_continues():
-            self.play_round(switch)
-            if switch == 0:
-                switch = 1
-            elif switch == 1:
-                switch = 0
+        while self.play_one_move():
+            pass
         if self.show_status:
             print("Game over, Final Scores:")
             print_scores(self.board.calc_scores())
 
-    def play_round(self, switch):
-        if switch == 0:
-            start = datetime.now()
-            self.play_move(self.player1)
-            self.decision_times[self.player1.symbol] += (datetime.now()-start).total_seconds()
-            start = datetime.now()
-            self.play_move(self.player2)
-            self.decision_times[self.player2.symbol] += (datetime.now()-start).total_seconds()
-
-        elif switch == 1:
-            start = datetime.now()
-            self.play_move(self.player2)
-            self.decision_times[self.player2.symbol] += (datetime.now() - start).total_seconds()
-            start = datetime.now()
-            self.play_move(self.player1)
-            self.decision_times[self.player1.symbol] += (datetime.now() - start).total_seconds()
-
-    def play_move(self, player):
-        if self.board.calc_valid_moves(player.symbol):
-            chosen_move = player.get_move(copy.deepcopy(self.board))
-            if not self.board.make_move(player.symbol, chosen_move):
-                print("Error: invalid move made")
-            elif self.show_status:
+    def play_one_move(self):
+        # Plays the next move (passing first if the player to move has none). Returns False once the game is over.
+        # The mover's valid moves are generated once here and handed to players that accept them.
+        if self.finished:
+            return False
+        start = time.perf_counter_ns()
+        player = self.next_player
+        moves = self.board.calc_valid_moves(player.symbol)
+        if not moves:
+            player = self.other_player(player)
+            moves = self.board.calc_valid_moves(player.symbol)
+            if not moves:
+                self.finished = True
+                return False
+            if self.show_status:
+                print(self.next_player.symbol, "can't move.")
+        self.harness_times[player.symbol] += time.perf_counter_ns() - start
+        self.play_move(player, moves)
+        self.next_player = self.other_player(player)
+        return True
+
+    def other_player(self, player):
+        return self.player2 if player is self.player1 else self.player1
+
+    def play_move(self, player, moves):
+        # Only the get_move call counts as decision time; copying the board, applying the move and drawing
+        # are harness overhead and are kept separately.
+        start = time.perf_counter_ns()
+        board = self.board.copy() if self.copy_board else self.board
+        empties = self.board.get_empty_count()
+        decision_start = time.perf_counter_ns()
+        if self.takes_moves[player.symbol]:
+            chosen_move = player.get_move(board, moves)
+        else:
+            chosen_move = player.get_move(board)
+        decision_ns = time.perf_counter_ns() - decision_start
+        self.decision_times[player.symbol] += decision_ns / 1e9
+        self.move_latencies.append((player.symbol, self.ply, empties, decision_ns))
+        self.ply += 1
+        stats = getattr(player, "last_stats", None)
+        if stats is not None:
+            self.search_stats[player.symbol].add(stats)
+        if not self.board.make_move(player.symbol, chosen_move):
+            print("Error: invalid move made")
+        else:
+            self.moves.append((player.symbol, list(chosen_move)))
+            self.move_times_ns.append(decision_ns)
+            if self.show_status:
                 self.board.draw_board()
                 print_scores(self.board.calc_scores())
-        elif self.show_status:
-            print(player.symbol, "can't move.")
+                if stats is not None:
+                    print(player.symbol, "search:", stats)
+        self.harness_times[player.symbol] += time.perf_counter_ns() - start - decision_ns
 
     def calc_winner(self):
         scores = self.board.calc_scores()
@@ -75,6 +125,38 @@ class ReversiGame:
     def get_decision_times(self):
         return self.decision_times
 
+    def get_search_stats(self):
+        return self.search_stats
+
+    def get_move_latencies(self):
+        return self.move_latencies
+
+    def get_harness_times(self):
+        return self.harness_times
+
+    def get_record(self, metadata=None):
+        # The game as a GameRecord: moves, per-move times, the players and their summed search statistics,
+        # plus any extra metadata (e.g. the tournament seed)
+        record_metadata = {"players": [describe_player(self.player1), describe_player(self.player2)],
+                           "winner": self.calc_winner(),
+                           "search_stats": {symbol: stats.as_dict() for symbol, stats in self.search_stats.items()
+                                            if stats.searches}}
+        record_metadata.update(metadata or {})
+        return GameRecord(self.board.get_size(), self.moves, self.move_times_ns, self.start, record_metadata)
+
+
+def accepts_moves(player):
+    # True if player.get_move can be called as get_move(board, moves)
+    try:
+        signature = inspect.signature(player.get_move)
+    except (TypeError, ValueError):
+        return False
+    try:
+        signature.bind(None, None)
+    except TypeError:
+        return False
+    return True
+
 
 def print_scores(score_map):
     for symbol in score_map:
@@ -82,24 +164,80 @@ def print_scores(score_map):
     print()
 
 
-def compare_players(player1, player2, board_size=8,  board_filename=None):
+def compare_players(player1, player2, board_size=8, board_filename=None, workers=1, seed=None, log_path=None):
+    # Plays 499 games between the players and prints the wins and total decision time of each.
+    # With workers > 1 the games are spread over a process pool. seed makes the run repeatable:
+    # game i is played with random.seed(seed + i) by fresh copies of the players as they were passed in
+    # (no transposition table entries, killer moves or history carried over from other games), so it is
+    # the same game whichever worker plays it and whatever it played before.
+    # Per-move latency percentiles are printed per player, overall and per game phase.
+    # With log_path every game is appended to that file as a GameRecord (see reversi.game_record).
     game_count_map = {player1.symbol: 0, player2.symbol: 0, "TIE": 0}
     time_elapsed_map = {player1.symbol: 0, player2.symbol: 0}
-    for i in range(1, 500):
+    latency_records = []
+    if workers > 1 and seed is None:
+        # Forked workers would otherwise share one random state and replay the same games
+        seed = random.randrange(2 ** 32)
+    game_seeds = [None if seed is None else seed + i for i in range(1, 500)]
+    log = None if log_path is None else GameLogWriter(log_path)
+    settings = (player1, player2, board_size, board_filename, log is not None)
+    try:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_tournament_worker,
+                                     initargs=settings) as executor:
+                results = executor.map(_play_tournament_game, game_seeds, chunksize=4)
+                _collect_results(results, game_count_map, time_elapsed_map, latency_records, log)
+        else:
+            _init_tournament_worker(*settings)
+            _collect_results(map(_play_tournament_game, game_seeds), game_count_map, time_elapsed_map,
+                             latency_records, log)
+    finally:
+        if log is not None:
+            log.close()
+    print(game_count_map)
+    print(time_elapsed_map)
+    print_latency_summary(latency_histograms(latency_records, (player1.symbol, player2.symbol)))
+
+
+def _collect_results(results, game_count_map, time_elapsed_map, latency_records, log=None):
+    for i, (winner, decision_times, latencies, record) in enumerate(results, 1):
+        latency_records.extend(latencies)
+        if log is not None:
+            log.write(record)
         if i % 100 == 0:
             print(i, "games finished")
-        game = ReversiGame(player1, player2, show_status=False, board_size=board_size,
-                           board_filename=board_filename)
-        game_count_map[game.calc_winner()] += 1
+        game_count_map[winner] += 1
         # the winning player gets incremented by 1 in game_count_map
-        decision_times = game.get_decision_times()
         # decision_times is a dictionary like this {"X": decisiion time X, "O": decision time O}
         for symbol in decision_times:
             # for each player's decision times
             time_elapsed_map[symbol] += decision_times[symbol]
             # add this decision time to the player's elapsed time
-    print(game_count_map)
-    print(time_elapsed_map)
+
+
+# Tournament settings for the games played in this process (set once per worker by the pool)
+_tournament = {}
+
+
+def _init_tournament_worker(player1, player2, board_size, board_filename, record=False):
+    # The players are kept pickled: every game unpickles its own copies
+    _tournament.update(players=pickle.dumps((player1, player2)), board_size=board_size,
+                       board_filename=board_filename, record=record)
+
+
+def _play_tournament_game(game_seed):
+    if game_seed is not None:
+        random.seed(game_seed)
+    player1, player2 = pickle.loads(_tournament["players"])
+    game = ReversiGame(player1, player2, show_status=False,
+                       board_size=_tournament["board_size"], board_filename=_tournament["board_filename"],
+                       copy_board=False)
+    squares = game.board.get_size() ** 2
+    latencies = [(symbol, game_phase(empties, squares), nanoseconds)
+                 for symbol, ply, empties, nanoseconds in game.get_move_latencies()]
+    # Records are only built (and sent back from worker processes) when the tournament is logged
+    record = game.get_record({"seed": game_seed}) if _tournament["record"] else None
+    return game.calc_winner(), game.get_decision_times(), latencies, record
 
 
 def main():
@@ -0,0 +1,288 @@
+# Asyncio game server: many concurrent games in one process, spoken to in JSON lines over TCP or a Unix socket.
+#
+#   python -m reversi.server --port 8765 --workers 4
+#   python -m reversi.server --unix /tmp/reversi.sock
+#
+# Every request is one JSON object per line and gets one JSON reply line with the same "id":
+#   {"id": 1, "op": "new", "size": 8}                      -> {"id": 1, "ok": true, "game": 1, "board": [...], ...}
+#   {"id": 2, "op": "move", "game": 1, "move": [2, 3]}     plays a move for the side to move
+#   {"id": 3, "op": "think", "game": 1, "player": "combined", "time_limit_ms": 500}
+#                                                          the named computer player picks and plays the move
+#                                                          (time_limit_ms > 0, cut to --max-time-limit-ms)
+#   {"id": 4, "op": "state", "game": 1}
+#   {"id": 5, "op": "cancel", "request": 3}                abandons a pending think request
+#   {"id": 6, "op": "close", "game": 1}
+# Failures reply {"id": ..., "ok": false, "error": "..."}.
+#
+# get_move runs in a bounded process pool, so searches never block the event loop. At most max_pending think
+# requests wait for a free worker; any more are answered "busy" straight away.
+# Each connection handles at most CONNECTION_REQUESTS requests at once and stops reading until one finishes,
+# so a client that sends faster than the pool searches is slowed down by TCP instead of queueing without bound.
+import argparse
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from reversi.reversi_board import ReversiBoard
+from reversi.player6.reversi_players import GreedyPlayer, MiniMaxPlayer, RandomComputerPlayer
+import reversi.player6.all_players as players
+
+PLAYER_FACTORIES = {
+    "default": players.get_default_player,
+    "a": players.get_player_a,
+    "b": players.get_player_b,
+    "c": players.get_player_c,
+    "d": players.get_player_d,
+    "combined": players.get_combined_player,
+    "greedy": GreedyPlayer,
+    "random": RandomComputerPlayer,
+}
+
+DEFAULT_TIME_LIMIT_MS = 1000
+# Longest search a think request may ask for: a running search holds its worker until it ends, cancelled or not
+MAX_TIME_LIMIT_MS = 10000
+# Extra time allowed on top of a request's time limit for the worker round trip before it is abandoned
+TIME_LIMIT_GRACE_MS = 500
+CONNECTION_REQUESTS = 16
+MAX_SIZE = 16
+
+
+class ServerGame:
+
+    def __init__(self, size):
+        self.board = ReversiBoard(size)
+        # X moves first; None once neither side can move
+        self.to_move = 'X'
+        # Requests on one game are applied one at a time
+        self.lock = asyncio.Lock()
+
+    def play(self, symbol, move):
+        if not self.board.make_move(symbol, move):
+            raise ValueError("invalid move")
+        opponent = self.board.get_opponent_symbol(symbol)
+        if self.board.calc_valid_moves(opponent):
+            self.to_move = opponent
+        elif not self.board.calc_valid_moves(symbol):
+            self.to_move = None
+
+    def state(self):
+        size = self.board.get_size()
+        rows = ["".join(self.board.get_symbol_for_position([x, y]) for y in range(size)) for x in range(size)]
+        return {"board": rows, "to_move": self.to_move, "scores": self.board.calc_scores(),
+                "valid_moves": [] if self.to_move is None else self.board.calc_valid_moves(self.to_move)}
+
+
+class GameServer:
+
+    def __init__(self, workers=2, max_pending=None, max_time_limit_ms=MAX_TIME_LIMIT_MS):
+        # Longer time limits in think requests are cut to max_time_limit_ms
+        self.workers = workers
+        self.max_pending = workers * 4 if max_pending is None else max_pending
+        self.max_time_limit_ms = max_time_limit_ms
+        self.games = {}
+        self._next_game = 1
+        self._executor = None
+        self._slots = None
+        # think requests waiting for a free worker
+        self._waiting = 0
+        # Running think requests: (connection id, request id) -> task, for cancel
+        self._thinking = {}
+
+    async def serve_tcp(self, host="127.0.0.1", port=8765):
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def serve_unix(self, path):
+        return await asyncio.start_unix_server(self.handle_connection, path)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def handle_connection(self, reader, writer):
+        connection = id(writer)
+        in_flight = set()
+        write_lock = asyncio.Lock()
+        try:
+            while True:
+                if len(in_flight) >= CONNECTION_REQUESTS:
+                    await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.ensure_future(self._answer(connection, line, writer, write_lock))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+        except (ConnectionError, asyncio.CancelledError):
+            # The client went away, or the server is shutting down
+            pass
+        finally:
+            for task in list(in_flight):
+                task.cancel()
+            writer.close()
+
+    async def _answer(self, connection, line, writer, write_lock):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            request_id = request.get("id")
+            reply = await self.handle(connection, request)
+            reply.update(ok=True)
+        except asyncio.CancelledError:
+            reply = {"ok": False, "error": "cancelled"}
+        except asyncio.TimeoutError:
+            reply = {"ok": False, "error": "timeout"}
+        except (ValueError, KeyError, TypeError) as error:
+            reply = {"ok": False, "error": str(error) or type(error).__name__}
+        except Exception as error:
+            # Anything else (a malformed field, a broken worker pool) fails this request, not the connection
+            reply = {"ok": False, "error": "internal error: %s" % (str(error) or type(error).__name__)}
+        reply["id"] = request_id
+        if writer.is_closing():
+            return
+        async with write_lock:
+            writer.write((json.dumps(reply) + "\n").encode())
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    async def handle(self, connection, request):
+        op = request["op"]
+        if op == "new":
+            size = int(request.get("size", 8))
+            if size < 4 or size > MAX_SIZE or size % 2:
+                raise ValueError("size must be even, from 4 to %d" % MAX_SIZE)
+            game_id = self._next_game
+            self._next_game += 1
+            self.games[game_id] = ServerGame(size)
+            return dict(self.games[game_id].state(), game=game_id)
+        if op == "cancel":
+            task = self._thinking.get((connection, request["request"]))
+            return {"cancelled": task is not None and task.cancel()}
+        game = self._game(request)
+        if op == "state":
+            return game.state()
+        if op == "close":
+            del self.games[request["game"]]
+            return {}
+        if op == "move":
+            async with game.lock:
+                if game.to_move is None:
+                    raise ValueError("game over")
+                game.play(game.to_move, list(request["move"]))
+                return game.state()
+        if op == "think":
+            task = asyncio.ensure_future(self._think(game, request))
+            key = (connection, request.get("id"))
+            self._thinking[key] = task
+            try:
+                return await task
+            finally:
+                self._thinking.pop(key, None)
+        raise ValueError("unknown op %r" % op)
+
+    async def _think(self, game, request):
+        name = request.get("player", "default")
+        if name not in PLAYER_FACTORIES:
+            raise ValueError("unknown player %r" % name)
+        time_limit_ms = int(request.get("time_limit_ms", DEFAULT_TIME_LIMIT_MS))
+        if time_limit_ms <= 0:
+            raise ValueError("time_limit_ms must be positive")
+        time_limit_ms = min(time_limit_ms, self.max_time_limit_ms)
+        timeout = (time_limit_ms + TIME_LIMIT_GRACE_MS) / 1000
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            self._slots = asyncio.Semaphore(self.workers)
+        async with game.lock:
+            symbol = game.to_move
+            if symbol is None:
+                raise ValueError("game over")
+            if self._waiting >= self.max_pending:
+                raise ValueError("busy")
+            # Jobs are only submitted when a worker is free, so the time limit covers the search and not the queue
+            self._waiting += 1
+            try:
+                await self._slots.acquire()
+            finally:
+                self._waiting -= 1
+            try:
+                job = self._executor.submit(_worker_move, name, symbol, game.board.to_bytes(), time_limit_ms)
+            except BaseException:
+                self._slots.release()
+                raise
+            # The worker is busy until the job itself ends, not when this request gives up on it: a search that
+            # already started runs to its own time limit (its result is dropped) and only then frees the slot
+            job.add_done_callback(lambda job: _call_soon(loop, self._slots.release))
+            move = await asyncio.wait_for(asyncio.wrap_future(job), timeout)
+            game.play(symbol, move)
+            return dict(game.state(), move=move, symbol=symbol)
+
+    def _game(self, request):
+        game = self.games.get(request.get("game"))
+        if game is None:
+            raise ValueError("unknown game")
+        return game
+
+
+def _call_soon(loop, callback):
+    # Runs callback on the event loop from a pool thread; nothing to do once the loop has closed
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:
+        pass
+
+
+def _worker_move(name, symbol, board_data, time_limit_ms):
+    # Runs in a pool process
+    board = ReversiBoard.from_bytes(board_data)[0]
+    player = _worker_player(name, symbol)
+    if isinstance(player, MiniMaxPlayer):
+        # Search as deep as the request's time limit allows (like MiniMaxPlayer2)
+        player.depth = None
+        player.time_limit_ms = time_limit_ms
+    return player.get_move(board)
+
+
+@lru_cache(maxsize=None)
+def _worker_player(name, symbol):
+    # One player per name and side per worker process, so its transposition table carries over between moves
+    return PLAYER_FACTORIES[name](symbol)
+
+
+async def serve(args):
+    server = GameServer(args.workers, args.max_pending, args.max_time_limit_ms)
+    if args.unix is not None:
+        listener = await server.serve_unix(args.unix)
+    else:
+        listener = await server.serve_tcp(args.host, args.port)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reversi game server (JSON lines over TCP or a Unix socket)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="think requests allowed to wait for a free worker (default 4 per worker)")
+    parser.add_argument("--max-time-limit-ms", type=int, default=MAX_TIME_LIMIT_MS,
+                        help="longer time limits in think requests are cut to this")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# The depth-1 batch path of AlphaBetaSearch against the plain search, through positions with passes.
+# The batch evaluator is a stub over the plain evaluation, so this needs no NumPy.
+import random
+
+import pytest
+
+from reversi.reversi_board import ReversiBoard
+from reversi.player6.evaluation import get_default_evaluator
+from reversi.player6.search import AlphaBetaSearch
+
+
+def stub_batch(evaluate):
+    def batch_evaluate(board, symbol, moves):
+        opponent = board.get_opponent_symbol(symbol)
+        scores = []
+        for move in moves:
+            undo = board.make_move(symbol, move)
+            scores.append(-evaluate(board, opponent))
+            board.unmake_move(undo)
+        return scores
+    return batch_evaluate
+
+
+def game_positions(size, games, seed):
+    # (board, symbol to move) for every position of random games; near the end many searches meet a pass
+    rng = random.Random(seed)
+    for i in range(games):
+        board = ReversiBoard(size)
+        symbol = 'X'
+        while board.game_continues():
+            moves = board.calc_valid_moves(symbol)
+            if moves:
+                yield board.copy(), symbol
+                board.make_move(symbol, rng.choice(moves))
+            symbol = board.get_opponent_symbol(symbol)
+
+
+@pytest.mark.parametrize("options", [{}, {"killer": True, "transposition": True}])
+def test_batch_matches_plain_search(options):
+    evaluate = get_default_evaluator(6).evaluate
+    for board, symbol in game_positions(6, 20, 0):
+        plain = AlphaBetaSearch(evaluate, **options)
+        batch = AlphaBetaSearch(evaluate, batch_evaluate=stub_batch(evaluate), **options)
+        before = board.to_bytes()
+        expected = plain.search(board, symbol, 3)[1]
+        move, score = batch.search(board, symbol, 3)
+        assert score == expected
+        assert board.is_valid_move(symbol, move)
+        assert board.to_bytes() == before
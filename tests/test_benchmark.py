@@ -0,0 +1,37 @@
+# Baseline comparison of the benchmark suite and the exit status of its command line.
+import json
+
+from reversi import benchmark
+from reversi.benchmark import compare_to_baseline
+
+
+def test_compare_to_baseline():
+    baseline = {"a": 1.0, "b": 1.0, "c": 1.0}
+    results = {"a": 1.1, "b": 1.5, "c": 0.5, "new": 9.0}
+    assert compare_to_baseline(results, baseline, 0.2) == [("b", 1.0, 1.5)]
+    assert compare_to_baseline(results, baseline, 0.05) == [("a", 1.0, 1.1), ("b", 1.0, 1.5)]
+    assert compare_to_baseline(results, {}, 0.2) == []
+
+
+def run_main(tmp_path, monkeypatch, baseline, results):
+    # main() with the suite replaced by fixed results, compared against baseline
+    monkeypatch.setattr(benchmark, "run_benchmarks", lambda *args: dict(results))
+    path = tmp_path / "baseline.json"
+    path.write_text(json.dumps({"results": baseline}))
+    return benchmark.main(["--baseline", str(path), "--output", str(tmp_path / "out.json")])
+
+
+def test_main_exit_status(tmp_path, monkeypatch, capsys):
+    assert run_main(tmp_path, monkeypatch, {"board/8/opening/calc_scores": 1.0},
+                    {"board/8/opening/calc_scores": 1.1}) == 0
+    assert run_main(tmp_path, monkeypatch, {"board/8/opening/calc_scores": 1.0},
+                    {"board/8/opening/calc_scores": 2.0}) == 1
+    assert "REGRESSION board/8/opening/calc_scores" in capsys.readouterr().out
+    assert json.loads((tmp_path / "out.json").read_text())["results"] == {"board/8/opening/calc_scores": 2.0}
+
+
+def test_run_benchmarks_names():
+    results = benchmark.run_benchmarks(sizes=[4], number=1, games=1, search=False)
+    assert "board/4/midgame/calc_valid_moves" in results
+    assert "game/random/4" in results
+    assert all(seconds >= 0 for seconds in results.values())
@@ -0,0 +1,72 @@
+# The bitboard engine against the list engine: both must agree on every position of random games.
+import random
+
+import pytest
+
+from reversi.reversi_board import ReversiBoard
+
+
+def squares(size, flips):
+    # The flipped squares of an undo record, from either engine
+    if isinstance(flips, int):
+        return {square for square in range(size * size) if flips >> square & 1}
+    return {x * size + y for x, y in flips}
+
+
+def snapshot(board, size):
+    return (board.to_bytes(), board.get_hash('X'), board.get_hash('O'), board.calc_scores(),
+            board.get_empty_count(), sorted(map(tuple, board.calc_valid_moves('X'))),
+            sorted(map(tuple, board.calc_valid_moves('O'))), board.get_weight_sum('X'), board.get_weight_sum('O'),
+            board.get_canonical_hash('X'))
+
+
+@pytest.mark.parametrize("size", [4, 6, 8, 10])
+@pytest.mark.parametrize("seed", range(3))
+def test_engines_agree(size, seed):
+    rng = random.Random(seed)
+    weights = [rng.randint(-5, 5) for _ in range(size * size)]
+    bits = ReversiBoard(size, bitboard=True)
+    tiles = ReversiBoard(size, bitboard=False)
+    for board in (bits, tiles):
+        board.set_weights(weights)
+        board.enable_symmetry()
+    symbol = 'X'
+    while True:
+        assert snapshot(bits, size) == snapshot(tiles, size)
+        assert bits.count_valid_moves(symbol) == len(tiles.calc_valid_moves(symbol))
+        moves = bits.calc_valid_moves(symbol)
+        if not moves:
+            symbol = bits.get_opponent_symbol(symbol)
+            if not bits.calc_valid_moves(symbol):
+                break
+            continue
+        invalid = [[x, y] for x in range(size) for y in range(size) if [x, y] not in moves]
+        if invalid:
+            move = rng.choice(invalid)
+            assert bits.make_move(symbol, move) is False
+            assert tiles.make_move(symbol, move) is False
+        before = snapshot(bits, size)
+        move = rng.choice(moves)
+        bits_undo = bits.make_move(symbol, move)
+        tiles_undo = tiles.make_move(symbol, move)
+        assert squares(size, bits_undo[2]) == squares(size, tiles_undo[2])
+        after = snapshot(bits, size)
+        assert snapshot(tiles, size) == after
+        # Undo and redo must give back exactly the positions before and after the move
+        bits.unmake_move(bits_undo)
+        tiles.unmake_move(tiles_undo)
+        assert snapshot(bits, size) == before
+        assert snapshot(tiles, size) == before
+        bits.redo_move(bits_undo)
+        tiles.redo_move(tiles_undo)
+        assert snapshot(bits, size) == after
+        assert snapshot(tiles, size) == after
+        symbol = bits.get_opponent_symbol(symbol)
+
+
+def test_copy_is_independent():
+    board = ReversiBoard(8)
+    copy = board.copy()
+    copy.make_move('X', copy.calc_valid_moves('X')[0])
+    assert board.to_bytes() == ReversiBoard(8).to_bytes()
+    assert board.get_hash() != copy.get_hash()
@@ -0,0 +1,78 @@
+# EndgameSolver against a brute-force search of every line to the end of the game.
+import random
+
+import pytest
+
+from reversi.reversi_board import ReversiBoard
+from reversi.player6.endgame import EndgameSolver
+from reversi.player6.search import SearchTimeout
+
+
+def play_to(size, empties, seed):
+    # (board, symbol to move) after random play leaves empties squares, with a move for symbol
+    rng = random.Random(seed)
+    board = ReversiBoard(size)
+    symbol = 'X'
+    while True:
+        moves = board.calc_valid_moves(symbol)
+        if moves and board.get_empty_count() <= empties:
+            return board, symbol
+        if not moves and not board.calc_valid_moves(board.get_opponent_symbol(symbol)):
+            return play_to(size, empties, seed + 1000)
+        if moves:
+            board.make_move(symbol, rng.choice(moves))
+        symbol = board.get_opponent_symbol(symbol)
+
+
+def brute_force(board, symbol):
+    # Final disc difference for symbol under perfect play, without pruning
+    opponent = board.get_opponent_symbol(symbol)
+    moves = board.calc_valid_moves(symbol)
+    if not moves:
+        if not board.calc_valid_moves(opponent):
+            scores = board.calc_scores()
+            return scores[symbol] - scores[opponent]
+        return -brute_force(board, opponent)
+    best = None
+    for move in moves:
+        undo = board.make_move(symbol, move)
+        score = -brute_force(board, opponent)
+        board.unmake_move(undo)
+        if best is None or score > best:
+            best = score
+    return best
+
+
+def sign(value):
+    return (value > 0) - (value < 0)
+
+
+@pytest.mark.parametrize("size, empties", [(4, 10), (6, 8), (8, 7)])
+@pytest.mark.parametrize("seed", range(4))
+def test_solver_matches_brute_force(size, empties, seed):
+    board, symbol = play_to(size, empties, seed)
+    opponent = board.get_opponent_symbol(symbol)
+    before = board.to_bytes()
+    expected = brute_force(board, symbol)
+
+    move, score = EndgameSolver().solve(board, symbol)
+    assert score == expected
+    assert board.to_bytes() == before
+    undo = board.make_move(symbol, move)
+    assert undo
+    assert -brute_force(board, opponent) == expected
+    board.unmake_move(undo)
+
+    move, score = EndgameSolver().solve(board, symbol, exact=False)
+    assert sign(score) == sign(expected)
+    undo = board.make_move(symbol, move)
+    assert sign(-brute_force(board, opponent)) == sign(expected)
+    board.unmake_move(undo)
+
+
+def test_solver_time_limit_leaves_board_untouched():
+    board, symbol = play_to(8, 24, 0)
+    before = board.to_bytes()
+    with pytest.raises(SearchTimeout):
+        EndgameSolver().solve(board, symbol, time_limit_ms=1)
+    assert board.to_bytes() == before
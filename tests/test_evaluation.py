@@ -0,0 +1,22 @@
+# Leaf scores must be zero-sum: negamax negates the opponent's score.
+import random
+
+import pytest
+
+from reversi.benchmark import benchmark_position
+from reversi.player6.evaluation import Evaluator, get_default_evaluator
+from reversi.player6.reversi_players import MiniMaxPlayer
+
+
+@pytest.mark.parametrize("size", [4, 6, 8])
+@pytest.mark.parametrize("phase", ["opening", "midgame", "endgame"])
+def test_evaluation_is_zero_sum(size, phase):
+    board, symbol = benchmark_position(size, phase)
+    rng = random.Random(size)
+    evaluators = [get_default_evaluator(size),
+                  Evaluator(size, [rng.uniform(-3, 3) for _ in range(size * size)], mobility=2, frontier=-1,
+                            stability=3)]
+    for evaluator in evaluators:
+        assert evaluator.evaluate(board, 'X') == pytest.approx(-evaluator.evaluate(board, 'O'))
+    player = MiniMaxPlayer('X', False, False, False, False)
+    assert player.move_score(board, 'X') == -player.move_score(board, 'O')
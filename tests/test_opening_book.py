@@ -0,0 +1,19 @@
+# Opening books built by self-play answer for either side opening, in any rotation of the position.
+from reversi.reversi_board import ReversiBoard
+from reversi.player6.all_players import get_default_player
+from reversi.player6.opening_book import OpeningBook, build_book
+
+
+def test_book_covers_both_first_movers(tmp_path):
+    path = str(tmp_path / "book6.bin")
+    count = build_book(path, get_default_player("X"), size=6, plies=4, games=6, depth=2)
+    book = OpeningBook(path)
+    try:
+        assert len(book) == count
+        for symbol in ("X", "O"):
+            board = ReversiBoard(6)
+            move = book.lookup(board, symbol)
+            assert move is not None and board.is_valid_move(symbol, move)
+        assert book.lookup(ReversiBoard(8), "X") is None
+    finally:
+        book.close()
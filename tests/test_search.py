@@ -0,0 +1,39 @@
+# AlphaBetaSearch against plain minimax: every enhancement must keep the exact root value.
+import pytest
+
+from reversi.benchmark import benchmark_position
+from reversi.player6.evaluation import get_default_evaluator
+from reversi.player6.search import AlphaBetaSearch
+
+
+def minimax(board, symbol, depth, evaluate):
+    # Plain negamax without pruning, scoring passes like AlphaBetaSearch
+    opponent = board.get_opponent_symbol(symbol)
+    if depth == 0:
+        return evaluate(board, symbol)
+    moves = board.calc_valid_moves(symbol)
+    if not moves:
+        if not board.calc_valid_moves(opponent):
+            return evaluate(board, symbol)
+        return -minimax(board, opponent, depth - 1, evaluate)
+    best = None
+    for move in moves:
+        undo = board.make_move(symbol, move)
+        score = -minimax(board, opponent, depth - 1, evaluate)
+        board.unmake_move(undo)
+        if best is None or score > best:
+            best = score
+    return best
+
+
+@pytest.mark.parametrize("options", [{}, {"killer": True, "transposition": True}, {"transposition": True,
+                                                                                 "symmetry": True}])
+@pytest.mark.parametrize("phase", ["opening", "midgame"])
+def test_alpha_beta_matches_minimax(options, phase):
+    board, symbol = benchmark_position(6, phase)
+    evaluate = get_default_evaluator(6).evaluate
+    expected = minimax(board, symbol, 3, evaluate)
+    search = AlphaBetaSearch(evaluate, **options)
+    move, score = search.search(board, symbol, 3)
+    assert score == expected
+    assert board.is_valid_move(symbol, move)
@@ -0,0 +1,47 @@
+# SearchCache storage and MiniMaxPlayer's use of it, including shared entries for symmetric positions.
+import json
+
+from reversi.benchmark import benchmark_position
+from reversi.reversi_board import ReversiBoard, transform_move
+from reversi.player6.reversi_players import MiniMaxPlayer
+from reversi.player6.search_cache import SearchCache
+
+
+def transformed(board, transform, tmp_path):
+    # The position of board under a rotation or reflection, loaded from a board file
+    size = board.get_size()
+    rows = [[' '] * size for _ in range(size)]
+    for x in range(size):
+        for y in range(size):
+            tx, ty = transform_move([x, y], transform, size)
+            rows[tx][ty] = board.get_symbol_for_position([x, y])
+    path = tmp_path / ("board%d.json" % transform)
+    path.write_text(json.dumps(rows))
+    return ReversiBoard(board_filename=str(path))
+
+
+def test_store_and_lookup(tmp_path):
+    cache = SearchCache(str(tmp_path / "cache.db"), max_entries=10)
+    cache.store(2 ** 64 - 1, 8, "a", 3, 1.5)
+    assert cache.lookup(2 ** 64 - 1, 8, "a") == (3, 1.5)
+    assert cache.lookup(2 ** 64 - 1, 8, "b") is None
+    assert cache.lookup(2 ** 64 - 1, 6, "a") is None
+    cache.close()
+    assert len(SearchCache(str(tmp_path / "cache.db"))) == 1
+
+
+def test_symmetric_positions_share_entries(tmp_path):
+    board, symbol = benchmark_position(6, "midgame")
+    path = str(tmp_path / "cache.db")
+    player = MiniMaxPlayer(symbol, False, True, True, False, symmetry=True, cache=path)
+    move = player.get_move(board)
+    assert player.last_depth == 4
+    for transform in range(1, 8):
+        other = transformed(board, transform, tmp_path)
+        reader = MiniMaxPlayer(symbol, False, True, True, False, symmetry=True, cache=path)
+        # Answered from the cache without searching, with the move mapped onto this position
+        assert reader.get_move(other) == transform_move(move, transform, 6)
+        assert reader.last_depth == 0
+    plain = MiniMaxPlayer(symbol, False, True, True, False, cache=path)
+    plain.get_move(board)
+    assert plain.last_depth == 4
@@ -0,0 +1,65 @@
+# GameServer round trip over TCP: a whole game played with think and move requests.
+import asyncio
+import json
+
+from reversi.server import GameServer
+
+
+async def play_game(size):
+    server = GameServer(workers=1, max_time_limit_ms=200)
+    listener = await server.serve_tcp(port=0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request_ids = iter(range(1, 10 ** 6))
+
+    async def call(**request):
+        request["id"] = next(request_ids)
+        writer.write((json.dumps(request) + "\n").encode())
+        await writer.drain()
+        reply = json.loads(await reader.readline())
+        assert reply["id"] == request["id"]
+        return reply
+
+    replies = []
+    try:
+        game = await call(op="new", size=size)
+        assert game["ok"] and game["to_move"] == "X"
+        state = game
+        while state["to_move"] is not None:
+            if state["to_move"] == "X":
+                reply = await call(op="think", game=game["game"], player="greedy", time_limit_ms=1000)
+                assert reply["ok"], reply
+                assert reply["symbol"] == "X" and reply["move"] in state["valid_moves"]
+            else:
+                reply = await call(op="move", game=game["game"], move=state["valid_moves"][0])
+                assert reply["ok"], reply
+            state = await call(op="state", game=game["game"])
+        replies.append(state)
+        replies.append(await call(op="move", game=game["game"], move=[0, 0]))
+        replies.append(await call(op="think", game=999))
+        other = await call(op="new", size=size)
+        replies.append(await call(op="think", game=other["game"], time_limit_ms=0))
+        # A limit far past the server's maximum is cut to it: the default player answers in time
+        replies.append(await call(op="think", game=other["game"], time_limit_ms=10 ** 9))
+        writer.write(b"[1, 2]\nnot json\n")
+        replies.append(json.loads(await reader.readline()))
+        replies.append(json.loads(await reader.readline()))
+        replies.append(await call(op="close", game=game["game"]))
+    finally:
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+        server.close()
+    return replies
+
+
+def test_server_round_trip():
+    final, after_end, unknown, no_time, capped, not_object, not_json, closed = asyncio.run(play_game(6))
+    assert final["ok"] and sum(final["scores"].values()) <= 36 and final["valid_moves"] == []
+    assert after_end == {"id": after_end["id"], "ok": False, "error": "game over"}
+    assert unknown["ok"] is False and unknown["error"] == "unknown game"
+    assert no_time == {"id": no_time["id"], "ok": False, "error": "time_limit_ms must be positive"}
+    assert capped["ok"] and capped["symbol"] == "X"
+    assert not_object["ok"] is False and not_object["id"] is None
+    assert not_json["ok"] is False
+    assert closed["ok"]
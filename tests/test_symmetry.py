@@ -0,0 +1,49 @@
+# Transposition table entries shared between rotated and reflected positions.
+import json
+
+import pytest
+
+from reversi.benchmark import benchmark_position
+from reversi.reversi_board import ReversiBoard, transform_move, untransform_move
+from reversi.player6.evaluation import get_default_evaluator
+from reversi.player6.search import AlphaBetaSearch
+
+
+def transformed(board, transform, tmp_path):
+    # The position of board under a rotation or reflection, loaded from a board file
+    size = board.get_size()
+    rows = [[' '] * size for _ in range(size)]
+    for x in range(size):
+        for y in range(size):
+            tx, ty = transform_move([x, y], transform, size)
+            rows[tx][ty] = board.get_symbol_for_position([x, y])
+    path = tmp_path / ("board%d.json" % transform)
+    path.write_text(json.dumps(rows))
+    return ReversiBoard(board_filename=str(path))
+
+
+@pytest.mark.parametrize("phase", ["opening", "midgame"])
+def test_symmetric_table_entries_give_legal_moves(phase, tmp_path):
+    board, symbol = benchmark_position(6, phase)
+    opponent = board.get_opponent_symbol(symbol)
+    evaluate = get_default_evaluator(6).evaluate
+    search = AlphaBetaSearch(evaluate, transposition=True, symmetry=True)
+    move, score = search.search(board, symbol, 4)
+    for transform in range(1, 8):
+        # Every child searched from the root is in the table; its rotations and reflections must find it
+        for child_move in board.calc_valid_moves(symbol):
+            undo = board.make_move(symbol, child_move)
+            child = transformed(board, transform, tmp_path)
+            board.unmake_move(undo)
+            key, child_transform = child.get_canonical_hash(opponent)
+            entry = search.table.probe(key)
+            assert entry is not None
+            table_move = entry[4]
+            if child_transform:
+                table_move = untransform_move(table_move, child_transform, 6)
+            assert child.is_valid_move(opponent, table_move)
+        # A search of the transformed position that hits those entries plays a legal move of the same value
+        other = transformed(board, transform, tmp_path)
+        other_move, other_score = search.search(other, symbol, 4)
+        assert other.is_valid_move(symbol, other_move)
+        assert other_score == score
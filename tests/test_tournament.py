@@ -0,0 +1,19 @@
+# compare_players with a seed plays the same games however many workers share them.
+from reversi.game_record import GameLog
+from reversi.reversi_game import compare_players
+from reversi.player6.reversi_players import MiniMaxPlayer, RandomComputerPlayer
+
+
+def logged_moves(tmp_path, workers):
+    path = tmp_path / ("games%d.log" % workers)
+    # Killer moves and the transposition table would carry state from game to game if players were reused
+    compare_players(MiniMaxPlayer("O", False, True, True, False, depth=3), RandomComputerPlayer("X"),
+                    board_size=4, workers=workers, seed=7, log_path=str(path))
+    return [(record.metadata["seed"], record.moves, record.metadata["winner"]) for record in GameLog(str(path))]
+
+
+def test_seeded_tournament_is_the_same_with_workers(tmp_path):
+    sequential = logged_moves(tmp_path, 1)
+    parallel = logged_moves(tmp_path, 2)
+    assert len(sequential) == 499
+    assert sequential == parallel